@@ -0,0 +1 @@
+@python "%~dp0pynodegraph-run" %*
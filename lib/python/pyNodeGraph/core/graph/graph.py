@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import os
+from pyNodeGraph.core.node import Node
+from pyNodeGraph.core.parse._xml import ET
+from pyNodeGraph.core.parse.loader import NodesXmlLoader
+from pyNodeGraph.core.state import GraphState
+from pyNodeGraph.utils.log import get_logger
+from .model import NodeModel
+from .index import NodesIndex
+from .plan import WithExecutionPlan
+
+logger = get_logger('pyNodeGraph.graph')
+
+
+class Graph(NodesXmlLoader, WithExecutionPlan):
+    """
+    headless node graph, load and execute a .pyng (or .pyngb) file without QApplication or QGraphicsScene.
+    """
+
+    def __init__(self):
+        self.path = None
+
+        self._nodesIndex = NodesIndex()
+
+    def _getUniqueName(self, name):
+        index = 0
+        newName = name
+        while newName in self._nodesIndex:
+            index += 1
+            newName = '{}{}'.format(name, index)
+        return newName
+
+    def _afterNodeNameChanged(self, node):
+        self.invalidateExecutionPlan()
+        self._nodesIndex.rename(node, node.name())
+
+    def createNode(self, nodeClass, name=None, pos=None, **kwargs):
+        if nodeClass not in Node.getAllNodeClassNames():
+            logger.warning('Un-Support Node Type! {}'.format(nodeClass))
+            return
+
+        if name is None:
+            name = nodeClass
+        nodeName = self._getUniqueName(name)
+        self.invalidateExecutionPlan()
+        nodeModel = NodeModel(
+            Node.getNodeClass(nodeClass),
+            graph=self,
+            name=nodeName,
+            **kwargs
+        )
+        nodeModel.afterAddToScene()
+        self._nodesIndex.add(nodeModel, nodeName)
+
+        if pos is not None:
+            nodeModel.setX(pos[0])
+            nodeModel.setY(pos[1])
+
+        return nodeModel
+
+    def deleteNode(self, node):
+        self.invalidateExecutionPlan()
+        for port in node.ports:
+            for pipe in port.pipes[::]:
+                pipe.breakConnection()
+        self._nodesIndex.remove(node)
+
+    def clear(self):
+        for node in self.allNodes():
+            self.deleteNode(node)
+
+    def allNodes(self):
+        return list(self._nodesIndex.nodes())
+
+    def iterNodes(self):
+        return iter(self._nodesIndex.nodes())
+
+    def hasNode(self, nodeName):
+        return nodeName in self._nodesIndex
+
+    def getNode(self, nodeName):
+        return self._nodesIndex.get(nodeName)
+
+    def getNodesByType(self, nodeType):
+        return self._nodesIndex.getByType(nodeType)
+
+    def getNodesByGroup(self, nodeGroup):
+        return self._nodesIndex.getByGroup(nodeGroup)
+
+    def getNodes(self, type=None):
+        if type is None:
+            return self.allNodes()
+        if not isinstance(type, (list, tuple)):
+            type = [type]
+        nodes = []
+        for t in type:
+            nodes.extend(self._nodesIndex.getByType(t))
+        return nodes
+
+    def getRootNode(self):
+        for node in self._nodesIndex.getByType('Main'):
+            return node
+
+    def loadNodesFromXml(self, nodesString):
+        rootElement = ET.fromstring(nodesString)
+        return self.createNodesFromXml(rootElement)
+
+    def setFile(self, path):
+        self.path = os.path.abspath(path)
+        self.clear()
+        self.createNodesFromFile(path)
+
+    def execute(self):
+        mainNode = self.getExecutionPlan().getRootNode()
+        if mainNode is None:
+            logger.warning('No Main node to execute!')
+            return False
+        GraphState.beginExecutionBatch()
+        try:
+            mainNode.execute()
+        finally:
+            GraphState.endExecutionBatch()
+        return True
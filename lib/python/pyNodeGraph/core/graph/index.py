@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import math
+
+class NodesIndex(object):
+    """
+    name, type and group lookup of the nodes in a scene, kept in sync by
+    the scene when nodes are created, deleted and renamed.
+    lookups return dict views (or an empty tuple), nothing is copied.
+    """
+
+    def __init__(self):
+        self._names = {}
+        self._byName = {}
+        self._byType = {}
+        self._byGroup = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._byName
+
+    def clear(self):
+        self._names = {}
+        self._byName = {}
+        self._byType = {}
+        self._byGroup = {}
+
+    def add(self, node, name):
+        self._names[node] = name
+        self._byName[name] = node
+        self._byType.setdefault(node.nodeType, {})[node] = None
+        self._byGroup.setdefault(node.nodeObject.nodeGroup, {})[node] = None
+
+    def remove(self, node):
+        name = self._names.pop(node, None)
+        if self._byName.get(name) is node:
+            self._byName.pop(name)
+        self._byType.get(node.nodeType, {}).pop(node, None)
+        self._byGroup.get(node.nodeObject.nodeGroup, {}).pop(node, None)
+
+    def rename(self, node, name):
+        oldName = self._names.get(node)
+        if self._byName.get(oldName) is node:
+            self._byName.pop(oldName)
+        self._names[node] = name
+        self._byName[name] = node
+
+    def replace(self, nodes):
+        """
+        :param nodes: {oldNode: newNode}, the new nodes take the names and the order of the old ones
+        """
+        self._names = dict((nodes.get(node, node), name) for node, name in self._names.items())
+        for oldNode, newNode in nodes.items():
+            self._byName[self._names[newNode]] = newNode
+        for byKey in (self._byType, self._byGroup):
+            for key, keyNodes in byKey.items():
+                if any(node in nodes for node in keyNodes):
+                    byKey[key] = dict((nodes.get(node, node), None) for node in keyNodes)
+
+    def nodes(self):
+        return self._names.keys()
+
+    def names(self):
+        return self._byName.keys()
+
+    def get(self, name):
+        return self._byName.get(name)
+
+    def getByType(self, nodeType):
+        nodes = self._byType.get(nodeType)
+        return () if nodes is None else nodes.keys()
+
+    def getByGroup(self, nodeGroup):
+        nodes = self._byGroup.get(nodeGroup)
+        return () if nodes is None else nodes.keys()
+
+
+class GridIndex(object):
+    """
+    objects bucketed by the square cells of a grid their rect touches, finds the objects in an area
+    without looking at all of them. rects are (x, y, w, h) tuples in scene units.
+    """
+
+    def __init__(self, cellSize=1000):
+        self.cellSize = cellSize
+        self._cells = {}
+        self._rects = {}
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, obj):
+        return obj in self._rects
+
+    def clear(self):
+        self._cells = {}
+        self._rects = {}
+
+    def getCells(self, x, y, w, h):
+        size = float(self.cellSize)
+        columns = range(int(math.floor(x / size)), int(math.floor((x + w) / size)) + 1)
+        rows = range(int(math.floor(y / size)), int(math.floor((y + h) / size)) + 1)
+        return [(column, row) for column in columns for row in rows]
+
+    def add(self, obj, rect):
+        self._rects[obj] = rect
+        for cell in self.getCells(*rect):
+            self._cells.setdefault(cell, {})[obj] = None
+
+    def remove(self, obj):
+        rect = self._rects.pop(obj, None)
+        if rect is None:
+            return
+        for cell in self.getCells(*rect):
+            objs = self._cells.get(cell)
+            objs.pop(obj, None)
+            if len(objs) == 0:
+                self._cells.pop(cell)
+
+    def replace(self, obj, newObj):
+        rect = self._rects.get(obj)
+        if rect is not None:
+            self.remove(obj)
+            self.add(newObj, rect)
+
+    def getRect(self, obj):
+        return self._rects.get(obj)
+
+    def get(self, cells):
+        """
+        :return: the objects in the cells, each once
+        """
+        objs = {}
+        for cell in cells:
+            cellObjs = self._cells.get(cell)
+            if cellObjs is not None:
+                objs.update(cellObjs)
+        return objs.keys()
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+from pyNodeGraph.core.node.node import DotNode, FlowDotNode
+from pyNodeGraph.core.parse.writer import NodeXmlWriter
+from pyNodeGraph.utils.log import get_logger
+
+logger = get_logger('pyNodeGraph.model')
+
+
+class PointModel(object):
+    def __init__(self, x=0.0, y=0.0):
+        self._x = x
+        self._y = y
+
+    def x(self):
+        return self._x
+
+    def y(self):
+        return self._y
+
+
+class EdgeModel(object):
+    def __init__(self, source=None, target=None):
+        self.source = source
+        self.target = target
+
+    def breakConnection(self):
+        for port in [self.source, self.target]:
+            if port is not None:
+                port.removePipe(self)
+
+
+class PortModel(object):
+    io = 0
+    maxConnections = None
+
+    def __init__(self, name='input', label=None, dataType=None, parameterPort=False):
+        self.name = name
+        self.label = label if label is not None else name
+        self.dataType = dataType
+        self.parameterPort = parameterPort
+        self.pipes = []
+        self._node = None
+
+    def node(self):
+        return self._node
+
+    def connectTo(self, port):
+        """
+        inputPort -> outputPort
+        :param port:
+        :return:
+        """
+        if port is self:
+            return
+
+        for pipe in self.pipes:
+            if (pipe.source == self and pipe.target == port) or (pipe.source == port and pipe.target == self):
+                return
+
+        self._checkConnectionNumber()
+        port._checkConnectionNumber()
+
+        if isinstance(self, InputPortModel):
+            pipe = EdgeModel(source=port, target=self)
+        else:
+            pipe = EdgeModel(source=self, target=port)
+
+        self.addPipe(pipe)
+        port.addPipe(pipe)
+
+    def addPipe(self, pipe):
+        self.pipes.append(pipe)
+        self._connectChanged()
+
+    def removePipe(self, pipe):
+        if pipe in self.pipes:
+            self.pipes.remove(pipe)
+            self._connectChanged()
+
+    def _connectChanged(self):
+        if self._node is not None:
+            self._node._portConnectionChanged(self)
+
+    def _checkConnectionNumber(self):
+        if self.maxConnections is None:
+            return
+        if len(self.pipes) == self.maxConnections:
+            self.pipes[0].breakConnection()
+
+
+class InputPortModel(PortModel):
+    io = 0
+
+    def __init__(self, *args, **kwargs):
+        super(InputPortModel, self).__init__(*args, **kwargs)
+        # flow input accept more than one upstream node, parameter input only one.
+        if self.parameterPort:
+            self.maxConnections = 1
+
+    def getConnections(self):
+        return [pipe.source for pipe in self.pipes if pipe.target == self and pipe.source is not None]
+
+
+class OutputPortModel(PortModel):
+    io = 1
+
+    def getConnections(self):
+        return [pipe.target for pipe in self.pipes if pipe.source == self]
+
+
+class NodeModel(NodeXmlWriter):
+    """
+    headless stand-in for NodeItem, holds ports and connections of a node without QGraphicsScene.
+    """
+    w = 150
+    h = 20
+
+    def __init__(self, nodeObjectClass, graph=None, **kwargs):
+        self.ports = []
+        self._graph = graph
+        self._pos = PointModel()
+
+        if issubclass(nodeObjectClass, DotNode):
+            parameterPort = not issubclass(nodeObjectClass, FlowDotNode)
+            self.inputPort = InputPortModel(name='i', parameterPort=parameterPort)
+            self.outputPort = OutputPortModel(name='o', parameterPort=parameterPort)
+            self.addPort(self.inputPort)
+            self.addPort(self.outputPort)
+
+        self.nodeObject = nodeObjectClass(item=self, **kwargs)
+
+    def scene(self):
+        return self._graph
+
+    def parameter(self, parameterName):
+        return self.nodeObject.parameter(parameterName)
+
+    def hasParameter(self, name):
+        return self.nodeObject.hasParameter(name)
+
+    def parameters(self):
+        return self.nodeObject.parameters()
+
+    def addParameter(self, *args, **kwargs):
+        return self.nodeObject.addParameter(*args, **kwargs)
+
+    def setMetadata(self, *args, **kwargs):
+        self.nodeObject.setMetadata(*args, **kwargs)
+
+    def Class(self):
+        return self.nodeObject.Class()
+
+    def name(self):
+        return self.nodeObject.name()
+
+    @property
+    def nodeType(self):
+        return self.nodeObject.nodeType
+
+    def scenePos(self):
+        return self._pos
+
+    def setX(self, x):
+        self._pos = PointModel(x, self._pos.y())
+
+    def setY(self, y):
+        self._pos = PointModel(self._pos.x(), y)
+
+    def setSizerPos(self):
+        pass
+
+    def update(self):
+        pass
+
+    def afterAddToScene(self):
+        pass
+
+    def addPort(self, port):
+        port._node = self
+        self.ports.append(port)
+
+    def addFlowPorts(self, flowPorts):
+        for d in flowPorts:
+            if d['type'] == 'input':
+                self.addPort(InputPortModel(name=d['name']))
+            elif d['type'] == 'output':
+                self.addPort(OutputPortModel(name=d['name']))
+
+    def addParameterInputPort(self, portName, label=None, dataType=None):
+        self.addPort(InputPortModel(name=portName, label=label, dataType=dataType, parameterPort=True))
+
+    def addParameterOutputPort(self, portName, label=None, dataType=None):
+        self.addPort(OutputPortModel(name=portName, label=label, dataType=dataType, parameterPort=True))
+
+    def removeParameterPort(self, portName):
+        port = self.getPort(portName)
+        if port is None:
+            return
+        for pipe in port.pipes[::]:
+            pipe.breakConnection()
+        self.ports.remove(port)
+        if self._graph is not None:
+            self._graph.invalidateExecutionPlan()
+
+    def getInputPorts(self):
+        return [port for port in self.ports if isinstance(port, InputPortModel)]
+
+    def getOutputPorts(self):
+        return [port for port in self.ports if isinstance(port, OutputPortModel)]
+
+    def getInputPort(self, portName):
+        for port in self.getInputPorts():
+            if port.name == portName:
+                return port
+
+    def getOutputPort(self, portName):
+        for port in self.getOutputPorts():
+            if port.name == portName:
+                return port
+
+    def getPort(self, portName):
+        for port in self.ports:
+            if port.name == portName:
+                return port
+
+    def _portConnectionChanged(self, port):
+        if self._graph is not None:
+            self._graph.invalidateExecutionPlan()
+        if isinstance(port, InputPortModel) and port.parameterPort:
+            parameter = self.parameter(port.name)
+            if parameter is None:
+                return
+            connections = port.getConnections()
+            if len(connections) == 0:
+                parameter.breakConnect()
+            elif len(connections) == 1:
+                connectPort = connections[0]
+                connectNode = connectPort.node()
+                connectPath = '{}.{}'.format(connectNode.name(), connectPort.name)
+                parameter.setConnect(connectPath)
+            else:
+                logger.warning('Input Port {}.{} has more than one connection!'.format(self.name(), port.name))
+
+    def connectSource(self, node, inputName='input', outputName='output'):
+        """
+        input -> output
+        :param node:
+        :param inputName:
+        :param outputName:
+        :return:
+        """
+        inputPort = self.getInputPort(inputName)
+        if inputPort is None:
+            logger.warning('Input Port Not Exist! {}:{}'.format(node.name(), inputName))
+            return
+
+        outputPort = node.getOutputPort(outputName)
+        if outputPort is None:
+            logger.warning('Output Port Not Exist! {}{}'.format(node.name(), outputName))
+            return
+
+        inputPort.connectTo(outputPort)
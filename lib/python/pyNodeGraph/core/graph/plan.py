@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from pyNodeGraph.core.node.node import DotNode
+from pyNodeGraph.core.node.pyNode import PyNode, PyFlowNode
+
+
+class ExecutionPlan(object):
+    """
+    flow successors and upstream parameters of every node, resolved once with dot nodes collapsed.
+    compiled from a scene (or headless graph), stays valid until the topology of the scene changes.
+    """
+
+    def __init__(self, scene):
+        self.valid = True
+        self._successors = {}
+        self._sources = {}
+        self._rootNode = None
+
+        self._compile(scene)
+
+    def _collectDotOutputNodes(self, dot, nodes):
+        for nextPort in dot.item.outputPort.getConnections():
+            node = nextPort.node().nodeObject
+            if isinstance(node, DotNode):
+                self._collectDotOutputNodes(node, nodes)
+            else:
+                nodes.append(node)
+
+    def _resolveDotInput(self, dot):
+        connections = dot.item.inputPort.getConnections()
+        if len(connections) == 0:
+            return None, None
+        upPort = connections[0]
+        upNode = upPort.node().nodeObject
+        if isinstance(upNode, DotNode):
+            return self._resolveDotInput(upNode)
+        return upNode, upPort.name
+
+    def _compileSuccessors(self, node):
+        successors = {}
+        for d in node.flowPorts:
+            if d['type'] != 'output':
+                continue
+            port = node.item.getOutputPort(d['name'])
+            nextNodes = []
+            if port is not None:
+                for nextPort in port.getConnections():
+                    nextNode = nextPort.node().nodeObject
+                    if isinstance(nextNode, DotNode):
+                        self._collectDotOutputNodes(nextNode, nextNodes)
+                    else:
+                        nextNodes.append(nextNode)
+            successors[d['name']] = tuple(nextNodes)
+        return successors
+
+    def _compileSources(self, scene, node):
+        sources = {}
+        for param in node.parameters():
+            if not param.hasConnect():
+                continue
+            connect = param.getConnect()
+            nodeName = connect.split('.')[0]
+            paramName = connect.split('.')[1]
+
+            upItem = scene.getNode(nodeName)
+            if upItem is None:
+                continue
+            upNode = upItem.nodeObject
+            if isinstance(upNode, DotNode):
+                upNode, paramName = self._resolveDotInput(upNode)
+                if upNode is None:
+                    continue
+
+            upParam = upNode.parameter(paramName)
+            if upParam is None:
+                continue
+            sources[param.name()] = (upNode, upParam)
+        return sources
+
+    def _compile(self, scene):
+        for item in scene.iterNodes():
+            node = item.nodeObject
+            if not isinstance(node, PyNode):
+                continue
+            if isinstance(node, PyFlowNode):
+                self._successors[node] = self._compileSuccessors(node)
+            self._sources[node] = self._compileSources(scene, node)
+            if node.nodeType == 'Main' and self._rootNode is None:
+                self._rootNode = node
+            node._executionPlan = self
+
+    def invalidate(self):
+        self.valid = False
+
+    def getRootNode(self):
+        return self._rootNode
+
+    def getSuccessors(self, node, name):
+        return self._successors.get(node, {}).get(name, ())
+
+    def getSource(self, node, paramName):
+        """
+        :return: (upNode, upParameter) or None if the parameter has no connect
+        """
+        return self._sources.get(node, {}).get(paramName)
+
+
+_compileLock = threading.Lock()
+
+
+class WithExecutionPlan(object):
+    """
+    keep a compiled ExecutionPlan for a scene, call invalidateExecutionPlan when topology changes.
+    subclass must implement iterNodes() and getNode(nodeName).
+    """
+    _executionPlan = None
+
+    def invalidateExecutionPlan(self):
+        if self._executionPlan is not None:
+            self._executionPlan.invalidate()
+            self._executionPlan = None
+
+    def getExecutionPlan(self):
+        # a loaded graph may be executed by several threads at once
+        with _compileLock:
+            if self._executionPlan is None:
+                self._executionPlan = ExecutionPlan(self)
+            return self._executionPlan
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+from pyNodeGraph.core.plugin.setup import *
+from pyNodeGraph.core.state import GraphState
+from .graph import Graph
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='pynodegraph-run',
+        description='Execute a .pyng file without the user interface.'
+    )
+    parser.add_argument('file', help='.pyng or .pyngb file to execute')
+    parser.add_argument(
+        '--cache', action='store_true',
+        help='re-run pure nodes only when their input values change'
+    )
+    args = parser.parse_args(argv)
+
+    GraphState.setEvaluationCacheEnabled(args.cache)
+
+    graph = Graph()
+    graph.setFile(args.file)
+    if not graph.execute():
+        return 1
+    return 0
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+import types
+import threading
+
+
+_local = threading.local()
+
+_NODE = 0
+_GENERATOR = 1
+_AFTER = 2
+
+
+def getCurrentExecutor():
+    return getattr(_local, 'executor', None)
+
+
+def getCurrentContext():
+    return getattr(_local, 'context', None)
+
+
+def setCurrentContext(context):
+    """
+    :return: the previous execution context of this thread, to restore later
+    """
+    previous = getCurrentContext()
+    _local.context = context
+    return previous
+
+
+class ExecutionContext(object):
+    """
+    transient output values of one run, kept apart from the parameters which hold the document state.
+    a child context (an iteration of Parallel For) falls back to its parent for values it didn't write,
+    then to the parameter itself.
+    also keeps the evaluation cache keys of non flow nodes for the run.
+    """
+    _missing = object()
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self._values = {}
+        self._cacheKeys = {}
+
+    def hasValue(self, param):
+        return param in self._values
+
+    def setValue(self, param, value):
+        self._values[param] = value
+
+    def getValue(self, param):
+        context = self
+        while context is not None:
+            value = context._values.get(param, self._missing)
+            if value is not self._missing:
+                return value
+            context = context.parent
+        return param.getValue()
+
+    def items(self):
+        return self._values.items()
+
+    def setCacheKey(self, node, key):
+        self._cacheKeys[node] = key
+
+    def getCacheKey(self, node):
+        # the nearest context that executed the node owns its values
+        context = self
+        while context is not None:
+            if node in context._cacheKeys:
+                return context._cacheKeys[node]
+            context = context.parent
+        return None
+
+
+class FlowExecutor(object):
+    """
+    run flow nodes from an explicit stack instead of nesting gotoNext calls,
+    so the python stack doesn't grow with the length of the flow.
+
+    gotoNext only schedules the next nodes, they run after the current node's _execute returns.
+    a node that needs a branch to finish before going on (loops, try) makes _execute a generator
+    and yields the output name, it's resumed when all nodes of that branch are done,
+    exceptions raised in the branch are thrown into the generator at the yield.
+    """
+
+    def __init__(self, context=None):
+        self._scheduled = None
+        self._context = context
+
+    def canSchedule(self):
+        return self._scheduled is not None
+
+    def schedule(self, nodes):
+        self._scheduled.extend(nodes)
+
+    def _pushNodes(self, stack, nodes):
+        for node in reversed(nodes):
+            stack.append((_NODE, node, None))
+
+    def _executeNode(self, node):
+        outer = self._scheduled
+        self._scheduled = []
+        try:
+            result = node._execute()
+        finally:
+            scheduled = self._scheduled
+            self._scheduled = outer
+        return result, scheduled
+
+    def _resume(self, gen, error=None):
+        outer = self._scheduled
+        self._scheduled = []
+        finished = False
+        branch = None
+        try:
+            if error is None:
+                branch = next(gen)
+            else:
+                branch = gen.throw(error)
+        except StopIteration:
+            finished = True
+        finally:
+            scheduled = self._scheduled
+            self._scheduled = outer
+        return finished, branch, scheduled
+
+    def _run(self, nodes):
+        stack = []
+        self._pushNodes(stack, nodes)
+        error = None
+
+        while len(stack) > 0:
+            kind, node, gen = stack.pop()
+            if error is not None and kind != _GENERATOR:
+                # unwinding to the nearest suspended generator, like an exception through nested calls
+                continue
+
+            try:
+                if kind == _AFTER:
+                    node._afterExecute()
+                    continue
+
+                if kind == _NODE:
+                    node._beforeExecute()
+                    gen, scheduled = self._executeNode(node)
+                    if not isinstance(gen, types.GeneratorType):
+                        stack.append((_AFTER, node, None))
+                        self._pushNodes(stack, scheduled)
+                        continue
+
+                throwError, error = error, None
+                finished, branch, scheduled = self._resume(gen, throwError)
+                if finished:
+                    stack.append((_AFTER, node, None))
+                else:
+                    stack.append((_GENERATOR, node, gen))
+                    self._pushNodes(stack, node.getNextNodes(branch))
+                self._pushNodes(stack, scheduled)
+            except Exception as e:
+                error = e
+
+        if error is not None:
+            raise error
+
+    def run(self, nodes):
+        previous = getCurrentExecutor()
+        _local.executor = self
+        previousContext = None
+        if self._context is not None:
+            previousContext = setCurrentContext(self._context)
+        try:
+            self._run(nodes)
+        finally:
+            _local.executor = previous
+            if self._context is not None:
+                setCurrentContext(previousContext)
@@ -6,6 +6,7 @@ from pyNodeGraph.ui.graph.const import *
 from pyNodeGraph.core.parameter import (
     Parameter, StringParameter, TextParameter, FloatParameter, BoolParameter, Color4fParameter, IntParameter
 )
+from pyNodeGraph.core.parameter.codec import getParsedValue
 from pyNodeGraph.utils.log import get_logger
 from pyNodeGraph.utils.const import INPUT_ATTRIBUTE_PREFIX, OUTPUT_ATTRIBUTE_PREFIX
 from pyNodeGraph.core.state.core import GraphState
@@ -108,6 +109,7 @@ class Node(QtCore.QObject):
         self._parametersName = []
         self._updateToDated = False
         self._metadata = {}
+        self._parsedMetadata = {}
         self._defaultMetadata = {}
 
         self._beforeInitParameters()
@@ -172,7 +174,7 @@ class Node(QtCore.QObject):
             self.item.setY(value)
 
     def _paramterValueChanged(self, parameter):
-        logger.debug('{}, {}'.format(parameter.name(), parameter.getValue()))
+        logger.debug('%s, %s', parameter.name(), parameter.getValue())
         self.parameterValueChanged.emit(parameter)
         self._whenParamterValueChanged(parameter)
         GraphState.executeCallbacks(
@@ -180,6 +182,11 @@ class Node(QtCore.QObject):
             node=self, parameter=parameter
         )
 
+    def _parameterConnectChanged(self, parameter):
+        scene = self.item.scene()
+        if scene is not None:
+            scene.invalidateExecutionPlan()
+
     def _whenParamterValueChanged(self, parameter):
         if parameter.name() == 'name':
             self.item.scene()._afterNodeNameChanged(self.item)
@@ -198,9 +205,10 @@ class Node(QtCore.QObject):
 
         parameterClass = Parameter.getParameter(parameterType)
         if parameterClass is None:
-            from pyNodeGraph.ui.utils.log import LogWindow
             message = 'Un-Support Parameter Type in addParameter! {}: {}'.format(parameterName, parameterType)
-            LogWindow.warning(message)
+            if QtWidgets.QApplication.instance() is not None:
+                from pyNodeGraph.ui.utils.log import LogWindow
+                LogWindow.warning(message)
             logger.warning(message)
             return
 
@@ -265,14 +273,10 @@ class Node(QtCore.QObject):
 
     def setMetadata(self, key, value):
         self._metadata[key] = str(value)
+        self._parsedMetadata.pop(key, None)
 
     def getMetadataValue(self, key, default=None):
-        strValue = self._metadata.get(key, default)
-        try:
-            value = eval(strValue)
-        except:
-            value = strValue
-        return value
+        return getParsedValue(self._parsedMetadata, self._metadata, key, default)
 
     def getMetadataKeys(self):
         return list(self._metadata.keys())
@@ -1,6 +1,32 @@
 # -*- coding: utf-8 -*-
 
+import threading
+
+from pyNodeGraph.core.state import GraphState
+from pyNodeGraph.utils.log import get_logger
 from .node import Node, DotNode
+from .executor import FlowExecutor, ExecutionContext, getCurrentExecutor, getCurrentContext, setCurrentContext
+
+logger = get_logger('pyNodeGraph.pyNode')
+
+_CACHE_VALUE_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+
+def _makeCacheKeyValue(value):
+    """
+    only immutable values can be part of a cache key, return None for others (list, dict, file...)
+    """
+    if isinstance(value, _CACHE_VALUE_TYPES):
+        # keep type in key, True == 1 == 1.0
+        return type(value), value
+    if isinstance(value, tuple):
+        items = []
+        for i in value:
+            item = _makeCacheKeyValue(i)
+            if item is None:
+                return
+            items.append(item)
+        return tuple, tuple(items)
 
 
 class PyNode(Node):
@@ -28,6 +54,7 @@ class PyNode(Node):
     def __init__(self, *args, **kwargs):
         super(PyNode, self).__init__(*args, **kwargs)
         self.hasError = False
+        self._executionPlan = None
 
     def _addParamsFromList(self, l, defaultName='name', namePrefix=''):
         for index, d in enumerate(l):
@@ -71,7 +98,40 @@ class PyNode(Node):
         else:
             return upNode, upPort.name
 
+    def getExecutionPlan(self):
+        plan = self._executionPlan
+        if plan is not None and plan.valid:
+            return plan
+
+    def _getParamValue(self, param):
+        context = getCurrentContext()
+        if context is None:
+            return param.getValue()
+        return context.getValue(param)
+
+    def setFlowValue(self, paramName, value):
+        """
+        set an output value during execution, use this instead of parameter(paramName).setValue,
+        the value goes to the current ExecutionContext and the parameter keeps the document state.
+        """
+        param = self.parameter(paramName)
+        context = getCurrentContext()
+        if context is None:
+            param.setValue(value)
+        else:
+            context.setValue(param, value)
+
     def getFlowValue(self, paramName):
+        plan = self.getExecutionPlan()
+        if plan is not None:
+            source = plan.getSource(self, paramName)
+            if source is None:
+                return self._getParamValue(self.parameter(paramName))
+            upNode, upParam = source
+            if isinstance(upNode, PyNonFlowNode):
+                upNode.execute()
+            return self._getParamValue(upParam)
+
         param = self.parameter(paramName)
         if param.hasConnect():
             connect = param.getConnect()
@@ -85,9 +145,9 @@ class PyNode(Node):
                 upNode.execute()
 
             upParam = upNode.parameter(paramName)
-            value = upParam.getValue()
+            value = self._getParamValue(upParam)
         else:
-            value = param.getValue()
+            value = self._getParamValue(param)
         return value
 
     def execute(self):
@@ -104,7 +164,7 @@ class PyNode(Node):
     def _executeArgs(self, *args, **kwargs):
         return
 
-    def _execute(self):
+    def _getExecuteArgs(self):
         params = self._getArgParams()
         args = []
         kwargs = {}
@@ -115,31 +175,89 @@ class PyNode(Node):
                 kwargs.update({
                     i.name().replace('inputs:', ''): self.getFlowValue(i.name())
                 })
+        return args, kwargs
 
+    def _execute(self):
+        args, kwargs = self._getExecuteArgs()
+        self._executeWithArgs(args, kwargs)
+
+    def _executeWithArgs(self, args, kwargs):
         try:
             results = self._executeArgs(*args, **kwargs)
         except:
             self.emitError()
             raise
         for index, resultParam in enumerate(self._getResultParams()):
-            resultParam.setValue(results[index])
+            self.setFlowValue(resultParam.name(), results[index])
 
     def emitError(self):
         self.hasError = True
-        self.item.update()
+        # items can only be repainted from the gui thread
+        if GraphState.isInExecutionBatch():
+            GraphState.deferItemUpdate(self.item)
+        elif threading.current_thread() is threading.main_thread():
+            self.item.update()
 
 
 class PyNonFlowNode(PyNode):
     fillNormalColor = (60, 50, 80)
     borderNormalColor = (140, 200, 190)
     flowPorts = []
+    # set False for nodes with side effects or nondeterministic results
+    cacheable = True
+
+    def _getCacheKey(self, args, kwargs):
+        key = []
+        for value in list(args) + list(kwargs.items()):
+            value = _makeCacheKeyValue(value)
+            if value is None:
+                return
+            key.append(value)
+        return tuple(key)
+
+    def _isCacheable(self):
+        # nodes with their own _execute read their inputs themselves, there are no pulled values to key on
+        if not self.cacheable or type(self)._execute is not PyNode._execute:
+            return False
+        return GraphState.isEvaluationCacheEnabled()
+
+    def execute(self):
+        # cache keys live in the context of the run, like the values they stand for
+        context = getCurrentContext()
+        if context is None or not self._isCacheable():
+            super(PyNonFlowNode, self).execute()
+            return
+
+        # pull upstream values once (cached upstream nodes don't re-run), skip if inputs not changed
+        args, kwargs = self._getExecuteArgs()
+        key = self._getCacheKey(args, kwargs)
+        if key is not None and key == context.getCacheKey(self):
+            return
+        context.setCacheKey(self, None)
+        self._beforeExecute()
+        self._executeWithArgs(args, kwargs)
+        self._afterExecute()
+
+        # mutable results may be changed in place by downstream nodes, don't reuse them
+        for param in self._getResultParams():
+            if _makeCacheKeyValue(context.getValue(param)) is None:
+                return
+        context.setCacheKey(self, key)
 
 
 class PyFlowNode(PyNode):
+    """
+    gotoNext runs the next nodes before it returns, like a nested call.
+    nodes that call gotoNext only at the end of _execute can set deferGotoNext True,
+    gotoNext then schedules the next nodes to run after _execute returns (see FlowExecutor)
+    and long flows don't grow the python stack.
+    to wait for a branch make _execute a generator and yield the output name.
+    """
     flowPorts = [
         {'type': 'input', 'name': 'In'},
         {'type': 'output', 'name': 'Out'},
     ]
+    deferGotoNext = False
 
     def _findDotOutputNodes(self, dot, nodes=[]):
         port = dot.item.outputPort
@@ -150,9 +268,14 @@ class PyFlowNode(PyNode):
             else:
                 nodes.append(node)
 
-    def gotoNext(self, name=None):
+    def getNextNodes(self, name=None):
         if name is None:
             name = 'Out'
+
+        plan = self.getExecutionPlan()
+        if plan is not None:
+            return plan.getSuccessors(self, name)
+
         port = self.item.getOutputPort(name)
         nextNodes = []
 
@@ -162,10 +285,26 @@ class PyFlowNode(PyNode):
                 self._findDotOutputNodes(node, nextNodes)
             else:
                 nextNodes.append(node)
+        return nextNodes
+
+    def gotoNext(self, name=None):
+        nextNodes = self.getNextNodes(name)
+
+        executor = getCurrentExecutor()
+        if executor is not None and executor.canSchedule() and self.deferGotoNext:
+            executor.schedule(nextNodes)
+            return
 
         for node in nextNodes:
             node.execute()
 
+    def execute(self):
+        executor = getCurrentExecutor()
+        if executor is None:
+            # start of a run, output values are kept in a new context
+            executor = FlowExecutor(ExecutionContext())
+        executor.run([self])
+
 
 # class FlowNode(PyFlowNode):
 #     flowPorts = [
@@ -252,6 +391,7 @@ class VarObjectArrayNode(PyFlowNode, _AddPortNode):
     borderNormalColor = (220, 200, 250)
     varType = 'object[]'
     nodeType = 'Var Object Array'
+    deferGotoNext = True
 
     @classmethod
     def getResultsDefine(cls):
@@ -269,7 +409,7 @@ class VarObjectArrayNode(PyFlowNode, _AddPortNode):
         inparams = self._getArgParams()
         for p in inparams:
             result.append(self.getFlowValue(p.name()))
-        self.parameter('outputs:result').setValue(result)
+        self.setFlowValue('outputs:result', result)
         self.gotoNext()
 
 
@@ -611,6 +751,7 @@ class MainNode(PyFlowNode):
     flowPorts = [
         {'type': 'output', 'name': 'Out'},
     ]
+    deferGotoNext = True
 
     def _execute(self):
         self.gotoNext()
@@ -620,6 +761,7 @@ class PrintNode(PyFlowNode):
     nodeType = 'Print'
     fillNormalColor = (50, 60, 50)
     borderNormalColor = (200, 150, 150, 200)
+    deferGotoNext = True
     args = [
         {'type': 'object', 'visible': False},
     ]
@@ -634,6 +776,7 @@ class LogicNode(PyFlowNode):
     fillNormalColor = (120, 10, 50)
     borderNormalColor = (90, 200, 150, 200)
     nodeGroup = 'Logic'
+    deferGotoNext = True
 
 
 class ForNode(LogicNode):
@@ -655,9 +798,173 @@ class ForNode(LogicNode):
     def _execute(self):
         value = self.getFlowValue('inputs:array')
         for index, each in enumerate(value):
-            self.parameter('outputs:index').setValue(index)
-            self.parameter('outputs:each').setValue(each)
-            self.gotoNext('For Each Loop')
+            self.setFlowValue('outputs:index', index)
+            self.setFlowValue('outputs:each', each)
+            yield 'For Each Loop'
+        self.gotoNext('Finally')
+
+
+_processGraph = None
+_processContext = None
+
+
+def _isPlainValue(value):
+    """
+    plain python data (numbers, strings, containers of them) can be sent to and back from worker processes,
+    checked by type so the values are only pickled once, when they are sent
+    """
+    if isinstance(value, _CACHE_VALUE_TYPES + (range, )):
+        return True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_isPlainValue(i) for i in value)
+    if isinstance(value, dict):
+        return all(_isPlainValue(k) and _isPlainValue(v) for k, v in value.items())
+    return False
+
+
+def _getPlainValues(items):
+    """
+    :return: {(node name, parameter name): value} of the plain values, names of the others
+    """
+    values = {}
+    skipped = []
+    for param, value in items:
+        key = (param.node().name(), param.name())
+        if _isPlainValue(value):
+            values[key] = value
+        else:
+            skipped.append('{}.{}'.format(*key))
+    return values, skipped
+
+
+def _setContextValues(context, graph, values):
+    for (nodeName, paramName), value in values.items():
+        node = graph.getNode(nodeName)
+        param = None if node is None else node.nodeObject.parameter(paramName)
+        if param is not None:
+            context.setValue(param, value)
+    return context
+
+
+def _initParallelForProcess(path, parentValues):
+    global _processGraph, _processContext
+    import pyNodeGraph.core.plugin.setup
+    from pyNodeGraph.core.graph import Graph
+
+    _processGraph = Graph()
+    _processGraph.setFile(path)
+    # runtime values of the enclosing run, the iterations fall back to them
+    _processContext = _setContextValues(ExecutionContext(), _processGraph, parentValues)
+
+
+def _runParallelForProcessIteration(nodeName, index, each):
+    node = _processGraph.getNode(nodeName).nodeObject
+    context = node._runIteration(index, each, _processContext)
+    return _getPlainValues(context.items())[0]
+
+
+class ParallelForNode(ForNode):
+    """
+    run the For Each Loop branch of every element in a pool of workers, each iteration has its own ExecutionContext.
+    Each Completed runs in the calling thread when an iteration is done, in index order if ordered
+    else as they complete, and sees the values of that iteration.
+    Finally runs after all workers have joined.
+
+    process mode loads the saved file of the graph in every worker process, unsaved changes are not seen.
+    runtime values of the enclosing run (outputs of earlier flow nodes, the each of an outer For Loop)
+    are sent to the workers only if they are plain python data (numbers, strings, lists, dicts...),
+    for other values (open files, objects) the workers see the saved parameter value.
+    the same goes for the values sent back to Each Completed, the elements must be picklable.
+    """
+    nodeType = 'Parallel For'
+    flowPorts = [
+        {'type': 'input', 'name': 'In'},
+        {'type': 'output', 'name': 'For Each Loop'},
+        {'type': 'output', 'name': 'Each Completed'},
+        {'type': 'output', 'name': 'Finally'},
+    ]
+    args = [
+        {'name': 'array', 'type': 'object[]', 'visible': False},
+        {'name': 'workers', 'type': 'int', 'default': 4},
+        {'name': 'mode', 'type': 'choose', 'default': 'thread', 'hints': {'options': ['thread', 'process']}},
+        {'name': 'ordered', 'type': 'bool', 'default': True},
+    ]
+
+    def _runIteration(self, index, each, parent=None):
+        context = ExecutionContext(parent)
+        context.setValue(self.parameter('outputs:index'), index)
+        context.setValue(self.parameter('outputs:each'), each)
+        FlowExecutor(context).run(self.getNextNodes('For Each Loop'))
+        return context
+
+    def _getProcessContext(self, values):
+        return _setContextValues(ExecutionContext(getCurrentContext()), self.item.scene(), values)
+
+    def _getParentValues(self):
+        items = {}
+        context = getCurrentContext()
+        parents = []
+        while context is not None:
+            parents.append(context)
+            context = context.parent
+        # nearest context wins
+        for context in reversed(parents):
+            items.update(context.items())
+
+        values, skipped = _getPlainValues(items.items())
+        if len(skipped) > 0:
+            logger.warning(
+                '%s: values not sent to the worker processes, they see the saved values: %s',
+                self.name(), ', '.join(skipped)
+            )
+        return values
+
+    def _createPool(self, mode, workers):
+        from concurrent import futures
+
+        if mode == 'process':
+            path = self.item.scene().path
+            if path is None:
+                raise RuntimeError('Parallel For in process mode needs the graph saved to a file!')
+            return futures.ProcessPoolExecutor(
+                workers, initializer=_initParallelForProcess, initargs=(path, self._getParentValues())
+            )
+        return futures.ThreadPoolExecutor(workers)
+
+    def _execute(self):
+        from concurrent import futures
+
+        array = self.getFlowValue('inputs:array')
+        workers = max(1, int(self.getFlowValue('inputs:workers')))
+        mode = self.getFlowValue('inputs:mode')
+        ordered = self.getFlowValue('inputs:ordered')
+
+        # compile the plan here, workers only read it
+        self.item.scene().getExecutionPlan()
+        parent = getCurrentContext()
+
+        with self._createPool(mode, workers) as pool:
+            if mode == 'process':
+                jobs = [pool.submit(_runParallelForProcessIteration, self.name(), index, each) for index, each in enumerate(array)]
+            else:
+                jobs = [pool.submit(self._runIteration, index, each, parent) for index, each in enumerate(array)]
+
+            try:
+                for job in (jobs if ordered else futures.as_completed(jobs)):
+                    context = job.result()
+                    if mode == 'process':
+                        context = self._getProcessContext(context)
+
+                    previous = setCurrentContext(context)
+                    try:
+                        yield 'Each Completed'
+                    finally:
+                        setCurrentContext(previous)
+            except BaseException:
+                for job in jobs:
+                    job.cancel()
+                raise
+
         self.gotoNext('Finally')
 
 
@@ -691,14 +998,15 @@ class TryNode(LogicNode):
 
     def _execute(self):
         try:
-            self.gotoNext('Try')
+            yield 'Try'
         except:
-            self.gotoNext('Execpt')
+            yield 'Execpt'
         self.gotoNext('Finally')
 
 
 class GetCurrentFileNode(PyNonFlowNode):
     nodeType = 'Get Current File'
+    cacheable = False
     results = [{'type': 'str'}]
 
     def _executeArgs(self, *args, **kwargs):
@@ -710,6 +1018,7 @@ class GetCurrentFileNode(PyNonFlowNode):
 
 class GetCurrentDirNode(PyNonFlowNode):
     nodeType = 'Get Current Dir'
+    cacheable = False
     results = [{'type': 'str'}]
 
     def _executeArgs(self, *args, **kwargs):
@@ -768,6 +1077,7 @@ Node.registerNode(SliceOneNode)
 Node.registerNode(MainNode)
 Node.registerNode(PrintNode)
 Node.registerNode(ForNode)
+Node.registerNode(ParallelForNode)
 Node.registerNode(IfNode)
 Node.registerNode(TryNode)
 
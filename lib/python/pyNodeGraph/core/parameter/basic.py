@@ -3,9 +3,31 @@
 import copy
 import json
 from pyNodeGraph.module.sqt import QtCore
+from pyNodeGraph.core.state import GraphState
+from .codec import getParsedValue
 
 
-class Parameter(QtCore.QObject):
+class _ParameterObserver(QtCore.QObject):
+    valueChanged = QtCore.Signal(object)
+
+
+class Parameter(object):
+    """
+    plain python object, the node is notified of changes directly.
+    the valueChanged signal lives on an observer QObject created when something first uses it (widgets).
+    subclasses should define __slots__ = () to keep parameters small.
+    """
+    __slots__ = (
+        '_name', '_label', '_node',
+        '_defaultValue', '_overrideValue', '_overrideConnect',
+        '_valueOverride', '_inheritValue', '_inheritConnect',
+        '_metadata', '_defaultMetadata', '_parsedMetadata',
+        '_hints', '_defaultHints', '_parsedHints',
+        '_builtIn', '_visible', '_isCustom',
+        '_paramWidgets', '_signalConnected', '_observer',
+        '__weakref__',
+    )
+
     parameterTypeString = '*'
     parameterWidgetString = None
     valueTypeName = None
@@ -14,8 +36,6 @@ class Parameter(QtCore.QObject):
     fillNormalColor = (50, 100, 80)
     borderNormalColor = None
 
-    valueChanged = QtCore.Signal(object)
-
     _parametersMap = {}
     _parameterWidgetsMap = {}
 
@@ -72,8 +92,6 @@ class Parameter(QtCore.QObject):
             hints=None,
             **kwargs
     ):
-        super(Parameter, self).__init__()
-
         self._name = name
         self._label = name if label is None else label
         self._node = parent
@@ -90,44 +108,57 @@ class Parameter(QtCore.QObject):
 
         self._metadata = {}
         self._defaultMetadata = {}
+        self._parsedMetadata = None
 
-        self._hints = {} if hints is None else hints
+        self._hints = {} if hints is None else dict(hints)
         self.initHints(self._hints)
         self._defaultHints = self._hints.copy()
+        self._parsedHints = None
 
         self._builtIn = builtIn
         self._visible = visible
         self._isCustom = custom
 
-        self._paramWidgets = []
+        self._paramWidgets = ()
 
-        self._signalConnected = False
-        self._reConnectSignal()
+        self._observer = None
+        self._signalConnected = True
 
     def initHints(self, hints):
         widget = hints.get('widget', '')
         if widget == '':
             hints['widget'] = self.parameterWidgetString
 
+    @property
+    def valueChanged(self):
+        if self._observer is None:
+            self._observer = _ParameterObserver()
+        return self._observer.valueChanged
+
     def addParamWidget(self, w):
         if w not in self._paramWidgets:
-            self._paramWidgets.append(w)
+            self._paramWidgets = self._paramWidgets + (w, )
 
     def removeParamWidget(self, w):
-        self._paramWidgets.remove(w)
+        widgets = list(self._paramWidgets)
+        widgets.remove(w)
+        self._paramWidgets = tuple(widgets)
 
     def _breakSignal(self):
-        if self._signalConnected:
-            self._signalConnected = False
-            self.valueChanged.disconnect(self._valueChanged)
+        self._signalConnected = False
 
     def _reConnectSignal(self):
-        if not self._signalConnected:
-            self._signalConnected = True
-            self.valueChanged.connect(self._valueChanged)
+        self._signalConnected = True
+
+    def _emitValueChanged(self):
+        if self._signalConnected:
+            self._node._paramterValueChanged(self)
+        if self._observer is not None:
+            self._observer.valueChanged.emit(self)
 
-    def _valueChanged(self, param):
-        self._node._paramterValueChanged(param)
+    def _connectChanged(self):
+        if self._node is not None:
+            self._node._parameterConnectChanged(self)
 
     def hasConnect(self):
         return self.getConnect() is not None
@@ -190,12 +221,9 @@ class Parameter(QtCore.QObject):
         return list(self._metadata.keys())
 
     def getMetadataValue(self, key, default=None):
-        strValue = self._metadata.get(key, default)
-        try:
-            value = eval(strValue)
-        except:
-            value = strValue
-        return value
+        if self._parsedMetadata is None:
+            self._parsedMetadata = {}
+        return getParsedValue(self._parsedMetadata, self._metadata, key, default)
 
     def getMetadatas(self):
         return self._metadata
@@ -216,13 +244,11 @@ class Parameter(QtCore.QObject):
         return self._defaultHints
 
     def getHintValue(self, key, defaultValue=None, tryEval=True):
-        value = self._hints.get(key, defaultValue)
-        if tryEval:
-            try:
-                value = eval(value)
-            except:
-                value = value
-        return value
+        if not tryEval:
+            return self._hints.get(key, defaultValue)
+        if self._parsedHints is None:
+            self._parsedHints = {}
+        return getParsedValue(self._parsedHints, self._hints, key, defaultValue)
 
     def getParameterWidgetClass(self):
         typeName = self.getHintValue('widget', tryEval=False)
@@ -246,9 +272,13 @@ class Parameter(QtCore.QObject):
         if key == 'custom' and value in [False, 'False']:
             return
         self._metadata[key] = str(value)
+        if self._parsedMetadata is not None:
+            self._parsedMetadata.pop(key, None)
 
     def setHint(self, key, value):
         self._hints[key] = str(value)
+        if self._parsedHints is not None:
+            self._parsedHints.pop(key, None)
 
     def _beforeSetValue(self):
         for w in self._paramWidgets:
@@ -259,19 +289,32 @@ class Parameter(QtCore.QObject):
             w._reConnectEditSignal()
 
     def setValue(self, value, emitSignal=True, override=True):
+        if GraphState.isInExecutionBatch():
+            self._valueOverride = override
+            self._overrideValue = value
+            if emitSignal:
+                GraphState.deferParameterChanged(self)
+            return
+
         self._beforeSetValue()
         self._valueOverride = override
         self._overrideValue = value
         if emitSignal:
-            self.valueChanged.emit(self)
+            self._emitValueChanged()
+        self._afterSetValue()
+
+    def emitValueChanged(self):
+        self._beforeSetValue()
+        self._emitValueChanged()
         self._afterSetValue()
 
     def setConnect(self, connect, emitSignal=True, override=True):
         self._beforeSetValue()
         self._valueOverride = override
         self._overrideConnect = connect
+        self._connectChanged()
         if emitSignal:
-            self.valueChanged.emit(self)
+            self._emitValueChanged()
         self._afterSetValue()
 
     def setInheritValue(self, value):
@@ -288,7 +331,8 @@ class Parameter(QtCore.QObject):
 
     def breakConnect(self):
         self._overrideConnect = None
-        self.valueChanged.emit(self)
+        self._connectChanged()
+        self._emitValueChanged()
 
     def getShowValues(self):
         if self._valueOverride:
@@ -309,12 +353,15 @@ class Parameter(QtCore.QObject):
 
     def setOverride(self, override):
         self._valueOverride = override
-        self.valueChanged.emit(self)
+        self._emitValueChanged()
 
     def isOverride(self):
         return self._valueOverride
 
-    def toXmlElement(self):
+    def toXmlElement(self, typed=False):
+        """
+        :param typed: keep the python value in val instead of its str(), for the binary format
+        """
         from pyNodeGraph.core.parse._xml import ET
 
         custom = self.isCustom()
@@ -341,6 +388,8 @@ class Parameter(QtCore.QObject):
 
         if connect is not None:
             paramElement.set('con', connect)
+        elif typed and self.name() != 'label':
+            paramElement.set('val', value)
         else:
             v = str(value)
             if self.name() == 'label':
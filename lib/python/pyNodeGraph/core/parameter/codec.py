@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+parse the str() of python values saved in files, hints and metadata, without eval.
+only literals are accepted (numbers, strings, bool, None, lists, tuples, dicts), results are cached by string.
+"""
+
+import re
+import ast
+
+_CACHE_SIZE = 20000
+
+_NUMBER_RE = re.compile(r'^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$')
+_INT_RE = re.compile(r'^[-+]?\d+$')
+_KEYWORDS = {'True': True, 'False': False, 'None': None}
+
+_missing = object()
+_failed = object()
+_cache = {}
+
+
+def copyValue(value):
+    # cached values are shared, give a fresh copy of containers
+    if isinstance(value, list):
+        return [copyValue(i) for i in value]
+    if isinstance(value, dict):
+        return dict((k, copyValue(v)) for k, v in value.items())
+    if isinstance(value, tuple):
+        return tuple(copyValue(i) for i in value)
+    return value
+
+
+def parseNumber(string):
+    """
+    :return: int or float, None if string is not a number
+    """
+    string = string.strip()
+    if _INT_RE.match(string):
+        return int(string)
+    if _NUMBER_RE.match(string):
+        return float(string)
+
+
+def _parse(string):
+    string = string.strip()
+    if string in _KEYWORDS:
+        return _KEYWORDS[string]
+    number = parseNumber(string)
+    if number is not None:
+        return number
+    return ast.literal_eval(string)
+
+
+def parseLiteral(string):
+    """
+    :raise ValueError: if string is not a python literal
+    """
+    value = _cache.get(string, _missing)
+    if value is _missing:
+        try:
+            value = _parse(string)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            value = _failed
+        if len(_cache) >= _CACHE_SIZE:
+            _cache.clear()
+        _cache[string] = value
+
+    if value is _failed:
+        raise ValueError('Not a python literal: {!r}'.format(string))
+    return copyValue(value)
+
+
+def getParsedValue(parsed, values, key, default=None):
+    """
+    tryParseLiteral(values[key]) memoized in the parsed dict, clear the key from parsed when values[key] changes
+    """
+    value = parsed.get(key, _missing)
+    if value is _missing:
+        if key not in values:
+            return tryParseLiteral(default)
+        value = tryParseLiteral(values[key])
+        parsed[key] = value
+    return copyValue(value)
+
+
+def tryParseLiteral(value):
+    """
+    parsed value if value is a literal string, else value itself, used for hints and metadata
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return parseLiteral(value)
+    except ValueError:
+        return value
+
+
+def parseNumberList(string):
+    """
+    fast path for vectors like "[0.1, 0.2, 0.3]", falls back to parseLiteral
+    """
+    stripped = string.strip()
+    if len(stripped) > 1 and stripped[0] in '[(' and stripped[-1] in '])':
+        items = stripped[1:-1].split(',')
+        if items[-1].strip() == '':
+            items = items[:-1]
+        values = []
+        for item in items:
+            number = parseNumber(item)
+            if number is None:
+                break
+            values.append(number)
+        else:
+            return values
+    return parseLiteral(string)
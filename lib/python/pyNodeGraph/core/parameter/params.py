@@ -1,32 +1,42 @@
+from pyNodeGraph.utils.log import get_logger
 from .basic import Parameter
+from .codec import parseLiteral, parseNumber, parseNumberList
+
+logger = get_logger('pyNodeGraph.parameter')
 
 
 class ObjectParameter(Parameter):
+    __slots__ = ()
     parameterTypeString = 'object'
     parameterWidgetString = 'str'
     valueDefault = None
 
 
 class _StringParameter(ObjectParameter):
+    __slots__ = ()
     fillNormalColor = (100, 130, 90)
     parameterWidgetString = 'str'
     valueDefault = ''
 
 
 class StringParameter(_StringParameter):
+    __slots__ = ()
     parameterTypeString = 'str'
 
 
 class FilePathParameter(StringParameter):
+    __slots__ = ()
     parameterTypeString = 'file'
 
 
 class TextParameter(StringParameter):
+    __slots__ = ()
     parameterTypeString = 'text'
     parameterWidgetString = 'text'
 
 
 class ChooseParameter(StringParameter):
+    __slots__ = ()
     parameterTypeString = 'choose'
     parameterWidgetString = 'choose'
 
@@ -40,20 +50,34 @@ class ChooseParameter(StringParameter):
 
 
 class _NonStringParameter(ObjectParameter):
+    __slots__ = ()
+    @classmethod
+    def parseString(cls, string):
+        """
+        :raise ValueError: if string can't be parsed to a value of this parameter type
+        """
+        return parseLiteral(string)
+
     @classmethod
     def _convertValueFromPy(cls, pyValue):
         if isinstance(pyValue, str):
-            pyValue = eval(pyValue)
+            try:
+                pyValue = cls.parseString(pyValue)
+            except ValueError:
+                logger.warning('Can not parse {} value: {!r}, use default.'.format(cls.parameterTypeString, pyValue))
+                pyValue = cls.getValueDefault()
         return pyValue
 
 
 class _NonBuiltinParameter(ObjectParameter):
+    __slots__ = ()
     @classmethod
     def _convertValueFromPy(cls, pyValue):
         return cls.valueDefault
 
 
 class BoolParameter(_NonStringParameter):
+    __slots__ = ()
     fillNormalColor = (180, 120, 50)
     parameterTypeString = 'bool'
     parameterWidgetString = 'boolean'
@@ -61,23 +85,34 @@ class BoolParameter(_NonStringParameter):
 
 
 class NumberParameter(_NonStringParameter):
+    __slots__ = ()
     fillNormalColor = (75, 135, 185)
     parameterTypeString = 'number'
     parameterWidgetString = 'floating'
     valueDefault = 0
 
+    @classmethod
+    def parseString(cls, string):
+        number = parseNumber(string)
+        if number is not None:
+            return number
+        return parseLiteral(string)
+
 
 class IntParameter(NumberParameter):
+    __slots__ = ()
     parameterTypeString = 'int'
     parameterWidgetString = 'integer'
 
 
 class FloatParameter(NumberParameter):
+    __slots__ = ()
     parameterTypeString = 'float'
     parameterWidgetString = 'floating'
 
 
 class _VecParamter(_NonStringParameter):
+    __slots__ = ()
 
     @classmethod
     def getValueDefault(cls):
@@ -88,6 +123,10 @@ class _VecParamter(_NonStringParameter):
         if value is not None:
             return [i for i in value]
 
+    @classmethod
+    def parseString(cls, string):
+        return parseNumberList(string)
+
     @classmethod
     def _convertValueFromPy(cls, pyValue):
         pyValue = super(_VecParamter, cls)._convertValueFromPy(pyValue)
@@ -96,32 +135,38 @@ class _VecParamter(_NonStringParameter):
 
 
 class Vec2fParameter(_VecParamter):
+    __slots__ = ()
     parameterTypeString = 'float2'
     parameterWidgetString = 'vec2f'
 
 
 class Vec3fParameter(_VecParamter):
+    __slots__ = ()
     parameterTypeString = 'float3'
     parameterWidgetString = 'vec3f'
 
 
 class Vec4fParameter(_VecParamter):
+    __slots__ = ()
     parameterTypeString = 'float4'
     parameterWidgetString = 'vec4f'
 
 
 class Color3fParameter(_VecParamter):
+    __slots__ = ()
     parameterTypeString = 'color3f'
     parameterWidgetString = 'color3f'
 
 
 class Color4fParameter(_VecParamter):
+    __slots__ = ()
     parameterTypeString = 'color4f'
     parameterWidgetString = 'color4f'
 
 
 # --------------------------------------- array ----------------------------------
 class _ArrayParameter(_NonStringParameter):
+    __slots__ = ()
     fillNormalColor = (220, 220, 20)
     valueDefault = []
 
@@ -149,51 +194,87 @@ class _ArrayParameter(_NonStringParameter):
 
 
 class ObjectArrayParameter(_ArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'object[]'
     parameterWidgetString = 'object[]'
 
 
 class StringArrayParameter(ObjectArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'str[]'
     parameterWidgetString = 'str[]'
 
 
 class NumberArrayParameter(ObjectArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'number[]'
     parameterWidgetString = 'float[]'
 
 
 class IntArrayParameter(NumberArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'int[]'
     parameterWidgetString = 'int[]'
 
 
 class TokenArrayParameter(ObjectArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'token[]'
     parameterWidgetString = 'token[]'
 
 
 class FloatArrayParameter(NumberArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'float[]'
     parameterWidgetString = 'float[]'
 
 
 class Vec2fArrayParameter(ObjectArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'float2[]'
     parameterWidgetString = 'vec2f[]'
 
 
 class Vec3fArrayParameter(ObjectArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'float3[]'
     parameterWidgetString = 'vec3f[]'
 
 
 class Vec4fArrayParameter(ObjectArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'float4[]'
     parameterWidgetString = 'vec4f[]'
 
 
 class Color3fArrayParameter(ObjectArrayParameter):
+    __slots__ = ()
     parameterTypeString = 'color3f[]'
     parameterWidgetString = 'vec3f[]'
 
+
+Parameter.registerParameter(ObjectParameter)
+Parameter.registerParameter(StringParameter)
+Parameter.registerParameter(ChooseParameter)
+Parameter.registerParameter(FilePathParameter)
+Parameter.registerParameter(TextParameter)
+Parameter.registerParameter(BoolParameter)
+Parameter.registerParameter(NumberParameter)
+Parameter.registerParameter(IntParameter)
+Parameter.registerParameter(FloatParameter)
+Parameter.registerParameter(Vec2fParameter)
+Parameter.registerParameter(Vec3fParameter)
+Parameter.registerParameter(Vec4fParameter)
+Parameter.registerParameter(Color3fParameter)
+Parameter.registerParameter(Color4fParameter)
+
+Parameter.registerParameter(ObjectArrayParameter)
+Parameter.registerParameter(StringArrayParameter)
+Parameter.registerParameter(TokenArrayParameter)
+Parameter.registerParameter(NumberArrayParameter)
+Parameter.registerParameter(IntArrayParameter)
+Parameter.registerParameter(FloatArrayParameter)
+Parameter.registerParameter(Vec2fArrayParameter)
+Parameter.registerParameter(Vec3fArrayParameter)
+Parameter.registerParameter(Vec4fArrayParameter)
+Parameter.registerParameter(Color3fArrayParameter)
@@ -1,53 +1,71 @@
-import tempfile
+import io
 import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
 
 
-def fixedWritexml(self, writer, indent="", addindent="", newl=""):
+def _escape(data):
+    if not isinstance(data, str):
+        # typed values of a binary graph
+        data = str(data)
+    data = data.replace('&', '&amp;')
+    data = data.replace('<', '&lt;')
+    data = data.replace('"', '&quot;')
+    data = data.replace('>', '&gt;')
+    return data
+
+
+class XmlWriter(object):
     """
-    :param indent:
-    :param addindent:
-    :param newl:
-    :return:
+    write elements straight to a file object in one pass,
+    same format as the old minidom output: sorted attributes, tab indentation.
     """
 
-    writer.write(indent+"<" + self.tagName)
-
-    attrs = self._get_attributes()
-    a_names = list(attrs.keys())
-    a_names.sort()
-
-    for a_name in a_names:
-        writer.write(" %s=\"" % a_name)
-        minidom._write_data(writer, attrs[a_name].value)
-        writer.write("\"")
-    if self.childNodes:
-        if len(self.childNodes) == 1 \
-          and self.childNodes[0].nodeType == minidom.Node.TEXT_NODE:
-            writer.write(">")
-            self.childNodes[0].writexml(writer, "", "", "")
-            writer.write("</%s>%s" % (self.tagName, newl))
-            return
-        writer.write(">%s" % (newl, ))
-        for node in self.childNodes:
-            if node.nodeType is not minidom.Node.TEXT_NODE:
-                node.writexml(writer, indent+addindent, addindent, newl)
-        writer.write("%s</%s>%s" % (indent, self.tagName, newl))
-    else:
-        writer.write("/>%s" % (newl, ))
+    def __init__(self, writer, addindent='\t', newl='\n'):
+        self.writer = writer
+        self.addindent = addindent
+        self.newl = newl
+        self._depth = 0
 
+    def writeHeader(self, encoding='utf-8'):
+        self.writer.write('<?xml version="1.0" encoding="{}"?>{}'.format(encoding, self.newl))
 
-minidom.Element.writexml = fixedWritexml
+    def _writeTag(self, tag, attrib):
+        write = self.writer.write
+        write(self.addindent * self._depth + '<' + tag)
+        for key in sorted(attrib.keys()):
+            write(' {}="{}"'.format(key, _escape(attrib[key])))
 
+    def startElement(self, tag, attrib=None):
+        self._writeTag(tag, attrib or {})
+        self.writer.write('>' + self.newl)
+        self._depth += 1
+
+    def endElement(self, tag):
+        self._depth -= 1
+        self.writer.write('{}</{}>{}'.format(self.addindent * self._depth, tag, self.newl))
+
+    def writeElement(self, element):
+        children = list(element)
+        if len(children) > 0:
+            self.startElement(element.tag, element.attrib)
+            for child in children:
+                self.writeElement(child)
+            self.endElement(element.tag)
+            return
+
+        self._writeTag(element.tag, element.attrib)
+        if element.text:
+            self.writer.write('>{}</{}>{}'.format(_escape(element.text), element.tag, self.newl))
+        else:
+            self.writer.write('/>' + self.newl)
 
-def convertToString(element):
-    string = ET.tostring(element)
-    document = minidom.parseString(string)
-    tmpFile = tempfile.mktemp(suffix='.xml')
-    with open(tmpFile, 'w') as f:
-        document.writexml(f, addindent='\t', newl='\n', encoding='utf-8')
-    with open(tmpFile, 'r') as f:
-        txt = f.read()
-    return txt
 
+def writeXml(element, writer):
+    xmlWriter = XmlWriter(writer)
+    xmlWriter.writeHeader()
+    xmlWriter.writeElement(element)
 
+
+def convertToString(element):
+    buffer = io.StringIO()
+    writeXml(element, buffer)
+    return buffer.getvalue()
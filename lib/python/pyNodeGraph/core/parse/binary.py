@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+compact binary container of the pynodegraph xml tree (.pyngb).
+
+    magic, version
+    string table     every tag, attribute name and string value once
+    root attributes
+    node elements    tag, typed attributes, children (p, m, h...) without o/i
+    edge table       the o/i children of every node: node index, direction, port, connected node, connected port
+
+numbers are varints, values keep their python type (None, bool, int, float, str, list, tuple, dict),
+so parameters don't need to eval a str() of the value when loading.
+"""
+
+import io
+import struct
+
+from ._xml import ET
+
+BINARY_EXTENSION = '.pyngb'
+BINARY_MAGIC = b'PYNGB\x00'
+BINARY_VERSION = 1
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_LIST = 6
+_TUPLE = 7
+_DICT = 8
+
+_EDGE_TAGS = ('o', 'i')
+
+_double = struct.Struct('<d')
+
+
+def isBinaryFile(path):
+    if path.endswith(BINARY_EXTENSION):
+        return True
+    with open(path, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+class _Writer(object):
+    def __init__(self):
+        self._strings = {}
+        self._body = io.BytesIO()
+
+    def _intern(self, string):
+        index = self._strings.get(string)
+        if index is None:
+            index = len(self._strings)
+            self._strings[string] = index
+        return index
+
+    def writeUInt(self, value, out=None):
+        out = self._body if out is None else out
+        while value > 0x7f:
+            out.write(struct.pack('B', (value & 0x7f) | 0x80))
+            value >>= 7
+        out.write(struct.pack('B', value))
+
+    def writeString(self, string):
+        self.writeUInt(self._intern(string))
+
+    def writeValue(self, value):
+        if value is None:
+            self.writeUInt(_NONE)
+        elif value is True:
+            self.writeUInt(_TRUE)
+        elif value is False:
+            self.writeUInt(_FALSE)
+        elif isinstance(value, int):
+            self.writeUInt(_INT)
+            # zigzag, small negative numbers stay small
+            self.writeUInt(value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            self.writeUInt(_FLOAT)
+            self._body.write(_double.pack(value))
+        elif isinstance(value, (list, tuple)):
+            self.writeUInt(_LIST if isinstance(value, list) else _TUPLE)
+            self.writeUInt(len(value))
+            for i in value:
+                self.writeValue(i)
+        elif isinstance(value, dict):
+            self.writeUInt(_DICT)
+            self.writeUInt(len(value))
+            for k, v in value.items():
+                self.writeValue(k)
+                self.writeValue(v)
+        else:
+            # same as the xml format for everything else
+            self.writeUInt(_STR)
+            self.writeString(value if isinstance(value, str) else str(value))
+
+    def writeAttrib(self, attrib):
+        self.writeUInt(len(attrib))
+        for key, value in attrib.items():
+            self.writeString(key)
+            self.writeValue(value)
+
+    def writeElement(self, element, edges=None):
+        self.writeString(element.tag)
+        self.writeAttrib(element.attrib)
+        children = list(element)
+        if edges is None:
+            self.writeUInt(len(children))
+            for child in children:
+                self.writeElement(child)
+            return
+
+        others = []
+        edgePos = None
+        for child in children:
+            if child.tag in _EDGE_TAGS:
+                if edgePos is None:
+                    edgePos = len(others)
+                edges.append(child)
+            else:
+                others.append(child)
+        self.writeUInt(len(others))
+        self.writeUInt(len(others) if edgePos is None else edgePos)
+        for child in others:
+            self.writeElement(child)
+
+    def save(self, rootElement, f):
+        nodeElements = list(rootElement)
+        self.writeString(rootElement.tag)
+        self.writeAttrib(rootElement.attrib)
+
+        self.writeUInt(len(nodeElements))
+        edgeTable = []
+        for index, nodeElement in enumerate(nodeElements):
+            edges = []
+            self.writeElement(nodeElement, edges)
+            for edge in edges:
+                edgeTable.append((index, edge))
+
+        self.writeUInt(len(edgeTable))
+        for index, edge in edgeTable:
+            self.writeUInt(index)
+            self.writeUInt(_EDGE_TAGS.index(edge.tag))
+            self.writeString(edge.get('n'))
+            self.writeString(edge.get('conN'))
+            self.writeString(edge.get('conP'))
+
+        f.write(BINARY_MAGIC)
+        self.writeUInt(BINARY_VERSION, out=f)
+        self.writeUInt(len(self._strings), out=f)
+        for string in self._strings:
+            data = string.encode('utf-8')
+            self.writeUInt(len(data), out=f)
+            f.write(data)
+        f.write(self._body.getvalue())
+
+
+class _Reader(object):
+    def __init__(self, data):
+        self._data = data
+        self._pos = 0
+        self._strings = []
+
+    def readUInt(self):
+        data = self._data
+        result = 0
+        shift = 0
+        while True:
+            byte = data[self._pos]
+            self._pos += 1
+            result |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def readString(self):
+        return self._strings[self.readUInt()]
+
+    def readValue(self):
+        kind = self.readUInt()
+        if kind == _NONE:
+            return None
+        if kind == _FALSE:
+            return False
+        if kind == _TRUE:
+            return True
+        if kind == _INT:
+            value = self.readUInt()
+            return value >> 1 if value & 1 == 0 else -((value + 1) >> 1)
+        if kind == _FLOAT:
+            value = _double.unpack_from(self._data, self._pos)[0]
+            self._pos += _double.size
+            return value
+        if kind == _STR:
+            return self.readString()
+        if kind in (_LIST, _TUPLE):
+            value = [self.readValue() for i in range(self.readUInt())]
+            return value if kind == _LIST else tuple(value)
+        if kind == _DICT:
+            value = {}
+            for i in range(self.readUInt()):
+                k = self.readValue()
+                value[k] = self.readValue()
+            return value
+        raise ValueError('Unknown value type in binary graph: {}'.format(kind))
+
+    def readAttrib(self):
+        attrib = {}
+        for i in range(self.readUInt()):
+            key = self.readString()
+            attrib[key] = self.readValue()
+        return attrib
+
+    def readElement(self, withEdgePos=False):
+        tag = self.readString()
+        element = ET.Element(tag, self.readAttrib())
+        count = self.readUInt()
+        edgePos = self.readUInt() if withEdgePos else None
+        for i in range(count):
+            element.append(self.readElement()[0])
+        return element, edgePos
+
+    def load(self):
+        if self._data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            raise ValueError('Not a binary node graph file!')
+        self._pos = len(BINARY_MAGIC)
+        version = self.readUInt()
+        if version > BINARY_VERSION:
+            raise ValueError('Unsupported binary node graph version: {}'.format(version))
+
+        for i in range(self.readUInt()):
+            size = self.readUInt()
+            self._strings.append(self._data[self._pos:self._pos + size].decode('utf-8'))
+            self._pos += size
+
+        rootTag = self.readString()
+        rootElement = ET.Element(rootTag, self.readAttrib())
+
+        nodeElements = []
+        edgePositions = []
+        for i in range(self.readUInt()):
+            nodeElement, edgePos = self.readElement(withEdgePos=True)
+            rootElement.append(nodeElement)
+            nodeElements.append(nodeElement)
+            edgePositions.append(edgePos)
+
+        edges = [[] for i in nodeElements]
+        for i in range(self.readUInt()):
+            index = self.readUInt()
+            tag = _EDGE_TAGS[self.readUInt()]
+            edgeElement = ET.Element(tag)
+            edgeElement.set('n', self.readString())
+            edgeElement.set('conN', self.readString())
+            edgeElement.set('conP', self.readString())
+            edges[index].append(edgeElement)
+
+        # put o/i back where they were in the node element
+        for nodeElement, edgePos, nodeEdges in zip(nodeElements, edgePositions, edges):
+            nodeElement[edgePos:edgePos] = nodeEdges
+
+        return rootElement
+
+
+def writeBinary(rootElement, f):
+    _Writer().save(rootElement, f)
+
+
+def readBinary(f):
+    return _Reader(bytearray(f.read())).load()
+
+
+def convertXmlToBinary(xmlPath, binaryPath):
+    rootElement = ET.parse(xmlPath).getroot()
+    with open(binaryPath, 'wb') as f:
+        writeBinary(rootElement, f)
+
+
+def convertBinaryToXml(binaryPath, xmlPath):
+    from ._xml import writeXml
+
+    with open(binaryPath, 'rb') as f:
+        rootElement = readBinary(f)
+    with open(xmlPath, 'w') as f:
+        writeXml(rootElement, f)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from ._xml import ET
+from .binary import isBinaryFile, readBinary
+
+
+class NodesXmlLoader(object):
+    """
+    create nodes and connections from pynodegraph xml elements,
+    shared by the ui scene and the headless graph.
+    subclass must implement createNode(nodeClass, name) and getNode(nodeName).
+    """
+
+    def createParamFromXml(self, paramElement, node, offsetX=0, offsetY=0):
+        paramName = paramElement.get('n')
+        if paramName in ['name']:
+            return
+
+        custom = paramElement.get('cus', '0')
+        visible = paramElement.get('vis', '1')
+        parameterType = paramElement.get('t')
+        value = paramElement.get('val')
+        connect = paramElement.get('con')
+        metadatas = paramElement.findall('m')
+        hints = paramElement.findall('h')
+
+        if node.hasParameter(paramName):
+            parameter = node.parameter(paramName)
+        else:
+            parameter = node.addParameter(paramName, parameterType, custom=custom)
+
+        if connect is not None:
+            parameter.setConnect(connect)
+
+        value = parameter.convertValueFromPy(value)
+        if paramName == 'x':
+            value = offsetX + value
+            node.nodeObject.setProperty('x', value)
+        elif paramName == 'y':
+            value = offsetY + value
+            node.nodeObject.setProperty('y', value)
+        elif node.nodeObject.hasProperty(paramName):
+            node.nodeObject.setProperty(paramName, value)
+        elif paramName == 'label':
+            value = value.replace('<\\n>', '\n')
+
+        parameter.setValueQuietly(value)
+
+        for metadataElement in metadatas:
+            self.createMetadataFromXml(metadataElement, parameter)
+        for hintElement in hints:
+            self.createHintFromXml(hintElement, parameter)
+
+    def createMetadataFromXml(self, metadataElement, obj):
+        key = metadataElement.get('k')
+        value = metadataElement.get('v')
+        obj.setMetadata(key, value)
+
+    def createHintFromXml(self, hintElement, obj):
+        key = hintElement.get('k')
+        value = hintElement.get('v')
+        obj.setHint(key, value)
+
+    def createNodeFromXml(self, nodeElement, _newNodes, _nameConvertDict, offsetX=0, offsetY=0):
+        oldNodeName = nodeElement.get('n')
+        nodeClass = nodeElement.get('c')
+        node = self.createNode(nodeClass, name=oldNodeName)
+        newName = node.parameter('name').getValue()
+
+        _newNodes.append(node)
+        _nameConvertDict.update({oldNodeName: newName})
+
+        for paramElement in nodeElement.findall('p'):
+            self.createParamFromXml(paramElement, node, offsetX, offsetY)
+
+        for metadataElement in nodeElement.findall('m'):
+            self.createMetadataFromXml(metadataElement, node)
+
+        node.afterAddToScene()
+
+    def getEdgesFromXml(self, nodeElement):
+        """
+        :return: [(nodeName, 'o' or 'i', portName, conNodeName, conPortName), ...]
+        """
+        nodeName = nodeElement.get('n')
+        edges = []
+        for element in nodeElement:
+            if element.tag in ('o', 'i'):
+                edges.append((nodeName, element.tag, element.get('n'), element.get('conN'), element.get('conP')))
+        return edges
+
+    def getConnectNode(self, nodeName):
+        """
+        node to connect by name, the ui scene makes sure it has an item
+        """
+        return self.getNode(nodeName)
+
+    def createConnectsFromEdges(self, edges, _nameConvertDict):
+        for nodeName, direction, portName, conNodeName, conPortName in edges:
+            node = self.getConnectNode(_nameConvertDict.get(nodeName))
+            if node is None:
+                continue
+
+            conNode = self.getConnectNode(_nameConvertDict.get(conNodeName))
+            if conNode is None:
+                conNode = self.getConnectNode(conNodeName)
+                if conNode is None:
+                    continue
+
+            if direction == 'o':
+                conNode.connectSource(node, inputName=conPortName, outputName=portName)
+            else:
+                node.connectSource(conNode, inputName=portName, outputName=conPortName)
+
+    def createConnectFromXml(self, nodeElement, _nameConvertDict):
+        self.createConnectsFromEdges(self.getEdgesFromXml(nodeElement), _nameConvertDict)
+
+    def getXmlRootOffset(self, rootElement):
+        """
+        offset added to the x, y of the created nodes, from the attributes of the root element
+        """
+        return 0, 0
+
+    def createNodesFromXml(self, rootElement, offsetX=0, offsetY=0):
+        _nameConvertDict = {}
+        _newNodes = []
+        edges = []
+        for nodeElement in rootElement:
+            self.createNodeFromXml(
+                nodeElement, _newNodes, _nameConvertDict,
+                offsetX, offsetY
+            )
+            edges.extend(self.getEdgesFromXml(nodeElement))
+
+        # connections
+        self.createConnectsFromEdges(edges, _nameConvertDict)
+
+        return _newNodes
+
+    def createNodesFromXmlFile(self, path, progress=None, chunkSize=500):
+        """
+        create nodes while the file is parsed, every node element is dropped once its node is created,
+        connections are made from the buffered edges at the end.
+
+        :param progress: called as progress(nodesCount, fraction) every chunkSize nodes and at the end,
+                         the ui processes events there to stay responsive
+        """
+        _nameConvertDict = {}
+        _newNodes = []
+        edges = []
+        offsetX = offsetY = 0
+        size = float(max(os.path.getsize(path), 1))
+
+        with open(path, 'rb') as f:
+            depth = 0
+            rootElement = None
+            for event, element in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 1:
+                        rootElement = element
+                        offsetX, offsetY = self.getXmlRootOffset(rootElement)
+                    continue
+
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                self.createNodeFromXml(element, _newNodes, _nameConvertDict, offsetX, offsetY)
+                edges.extend(self.getEdgesFromXml(element))
+                rootElement.remove(element)
+
+                if progress is not None and len(_newNodes) % chunkSize == 0:
+                    progress(len(_newNodes), min(f.tell() / size, 1.0))
+
+        self.createConnectsFromEdges(edges, _nameConvertDict)
+        if progress is not None:
+            progress(len(_newNodes), 1.0)
+
+        return _newNodes
+
+    def createNodesFromFile(self, path, progress=None, chunkSize=500):
+        """
+        create nodes from a .pyng xml file or a .pyngb binary file
+        """
+        if not isBinaryFile(path):
+            return self.createNodesFromXmlFile(path, progress=progress, chunkSize=chunkSize)
+
+        with open(path, 'rb') as f:
+            rootElement = readBinary(f)
+        offsetX, offsetY = self.getXmlRootOffset(rootElement)
+        nodes = self.createNodesFromXml(rootElement, offsetX, offsetY)
+        if progress is not None:
+            progress(len(nodes), 1.0)
+        return nodes
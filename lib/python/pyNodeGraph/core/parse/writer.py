@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+from ._xml import ET, convertToString
+
+
+class NodeXmlWriter(object):
+    """
+    pynodegraph xml element of a node with its parameters, connections and metadata,
+    shared by the ui NodeItem and the headless NodeModel.
+    subclass must have nodeObject and implement parameter(name), getInputPorts() and getOutputPorts().
+    """
+
+    def _getInputsList(self):
+        inputs = []
+        for inputPort in self.getInputPorts():
+            if len(inputPort.getConnections()) > 0:
+                for outputPort in inputPort.getConnections():
+                    node = outputPort.node()
+                    inputs.append([inputPort.name, node.name(), outputPort.name])
+        return inputs
+
+    def _getOutputsList(self):
+        outputs = []
+        for outputPort in self.getOutputPorts():
+            if len(outputPort.getConnections()) > 0:
+                for inputPort in outputPort.getConnections():
+                    node = inputPort.node()
+                    outputs.append([outputPort.name, node.name(), inputPort.name])
+        return outputs
+
+    def toXmlElement(self, typed=False):
+        nodeElement = ET.Element('n')
+        nodeElement.set('n', self.parameter('name').getValue())
+        nodeElement.set('c', self.Class())
+
+        for paramName, param in self.nodeObject._parameters.items():
+            if paramName != 'name':
+                override = param.isOverride()
+                custom = param.isCustom()
+
+                if not (override or custom) and not self.nodeObject.hasProperty(paramName):
+                    continue
+
+                paramElement = param.toXmlElement(typed=typed)
+                nodeElement.append(paramElement)
+
+        inputs = self._getInputsList()
+        outputs = self._getOutputsList()
+
+        for outputName, nodeName, inputName in outputs:
+            outputElement = ET.Element('o')
+            outputElement.set('n', outputName)
+            outputElement.set('conN', nodeName)
+            outputElement.set('conP', inputName)
+            nodeElement.append(outputElement)
+
+        for inputName, nodeName, outputName in inputs:
+            inputElement = ET.Element('i')
+            inputElement.set('n', inputName)
+            inputElement.set('conN', nodeName)
+            inputElement.set('conP', outputName)
+            nodeElement.append(inputElement)
+
+        for key, value in self.nodeObject.getMetadatas().items():
+            metadataElement = ET.Element('m')
+            metadataElement.set('k', key)
+            metadataElement.set('v', value)
+            nodeElement.append(metadataElement)
+
+        return nodeElement
+
+    def toXml(self):
+        element = self.toXmlElement()
+        return convertToString(element)
@@ -1,3 +1,5 @@
+import threading
+
 from pyNodeGraph.module.sqt import QtCore
 
 
@@ -8,6 +10,60 @@ class GraphState(QtCore.QObject):
 
     _state = None
 
+    _evaluationCache = False
+
+    _batchDepth = 0
+    _batchParameters = {}
+    _batchItems = {}
+    _batchLock = threading.Lock()
+
+    @classmethod
+    def setEvaluationCacheEnabled(cls, enabled):
+        cls._evaluationCache = enabled
+
+    @classmethod
+    def isEvaluationCacheEnabled(cls):
+        return cls._evaluationCache
+
+    @classmethod
+    def beginExecutionBatch(cls):
+        """
+        defer valueChanged signals and item repaints until endExecutionBatch,
+        parameters set many times during the batch emit only once.
+        """
+        with cls._batchLock:
+            cls._batchDepth += 1
+
+    @classmethod
+    def isInExecutionBatch(cls):
+        return cls._batchDepth > 0
+
+    @classmethod
+    def deferParameterChanged(cls, parameter):
+        with cls._batchLock:
+            cls._batchParameters[parameter] = None
+
+    @classmethod
+    def deferItemUpdate(cls, item):
+        with cls._batchLock:
+            cls._batchItems[item] = None
+
+    @classmethod
+    def endExecutionBatch(cls):
+        with cls._batchLock:
+            cls._batchDepth -= 1
+            if cls._batchDepth > 0:
+                return
+            parameters = cls._batchParameters
+            items = cls._batchItems
+            cls._batchParameters = {}
+            cls._batchItems = {}
+
+        for parameter in parameters:
+            parameter.emitValueChanged()
+        for item in items:
+            item.update()
+
     @classmethod
     def addCallback(cls, callbackType, func):
         if callbackType not in cls._callbacks:
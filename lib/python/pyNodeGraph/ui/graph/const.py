@@ -13,4 +13,7 @@ PADDING_Y = 100
 DEFAULT_COLOR = [210, 210, 210]
 DEFAULT_LABEL_COLOR = QtGui.QColor(200, 200, 200)
 PORT_SPACING = 20
+# below this zoom nodes paint as flat rectangles, pipes as straight lines, ports and tags are not painted,
+# nodes without item are painted by the view and get their items when zoomed in
+LOW_DETAIL_ZOOM = 0.3
 
@@ -12,6 +12,7 @@ from ..const import *
 from pyNodeGraph.utils.log import get_logger
 from pyNodeGraph.core.node import Node
 from pyNodeGraph.core.parameter.basic import Parameter
+from pyNodeGraph.core.parse.writer import NodeXmlWriter
 from pyNodeGraph.core.parameter.params import ObjectParameter
 from pyNodeGraph.ui.graph.other.tag import LockTag
 from pyNodeGraph.core.state import GraphState
@@ -24,11 +25,87 @@ NAME_FONT = QtGui.QFont('Arial', 10, italic=True)
 NAME_FONT.setBold(True)
 LABEL_FONT = QtGui.QFont('Arial', 10)
 
-EXPRESSION_VALUE_PATTERN = re.compile(r'\[value [^\[\]]+\]')
-EXPRESSION_PYTHON_PATTERN = re.compile(r'\[python [^\[\]]+\]')
+EXPRESSION_VALUE_PATTERN = re.compile(r'\[value ([^\[\]]+)\]')
+EXPRESSION_PYTHON_PATTERN = re.compile(r'\[python ([^\[\]]+)\]')
 
+# changed labels are refreshed together at most once per frame
+LABEL_UPDATE_INTERVAL = 16
 
-class _BaseNodeItem(QtWidgets.QGraphicsItem):
+
+class LabelTemplate(object):
+    """
+    node label parsed once into text and [value param] parts, [python expression] is evaluated after the
+    values are in, like [python [value count] * 2], expressions are compiled once.
+    params are the parameters the label shows, the label only needs to be refreshed when one of them changes.
+    """
+    _templates = {}
+    _codes = {}
+
+    @classmethod
+    def get(cls, label):
+        template = cls._templates.get(label)
+        if template is None:
+            if len(cls._templates) >= 1000:
+                cls._templates.clear()
+            template = cls(label)
+            cls._templates[label] = template
+        return template
+
+    @classmethod
+    def getCode(cls, expression):
+        code = cls._codes.get(expression)
+        if code is None:
+            if len(cls._codes) >= 1000:
+                cls._codes.clear()
+            try:
+                code = compile(expression, '<string>', 'eval')
+            except(Exception) as e:
+                code = e
+            cls._codes[expression] = code
+        return code
+
+    def __init__(self, label):
+        self.parts = []
+        self.params = set(['label', 'labelFontSize'])
+        self.hasPython = '[python ' in label
+
+        pos = 0
+        for match in EXPRESSION_VALUE_PATTERN.finditer(label):
+            if match.start() > pos:
+                self.parts.append(('text', label[pos:match.start()]))
+            paramName = match.group(1)
+            self.params.add(paramName)
+            self.parts.append(('value', (paramName, match.group())))
+            pos = match.end()
+        if pos < len(label):
+            self.parts.append(('text', label[pos:]))
+
+    def _evalPython(self, match):
+        code = self.getCode(match.group(1))
+        if isinstance(code, Exception):
+            return str(code)
+        try:
+            result = eval(code, globals(), Node._expressionMap)
+        except(Exception) as e:
+            result = e
+        return str(result)
+
+    def render(self, node):
+        texts = []
+        for kind, data in self.parts:
+            if kind == 'text':
+                texts.append(data)
+            else:
+                paramName, expString = data
+                param = node.parameter(paramName)
+                texts.append(str(param.getValue()) if param is not None else expString)
+        label = ''.join(texts)
+        if self.hasPython:
+            label = EXPRESSION_PYTHON_PATTERN.sub(self._evalPython, label)
+        return label.replace('\n', '<p>')
+
+
+class _BaseNodeItem(QtWidgets.QGraphicsItem, NodeXmlWriter):
     x = 0
     y = 0
     w = 150
@@ -39,7 +116,10 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
 
     disablePenColor = QtGui.QColor(150, 20, 20)
 
-    def __init__(self, nodeObjectClass, **kwargs):
+    # selection state fillColor/borderColor were last computed for
+    _highlight = None
+
+    def __init__(self, nodeObjectClass, nodeModel=None, **kwargs):
         super(_BaseNodeItem, self).__init__()
 
         self.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
@@ -56,13 +136,37 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
 
         self._initUI()
 
-        self.nodeObject = nodeObjectClass(item=self, **kwargs)
+        if nodeModel is None:
+            self.nodeObject = nodeObjectClass(item=self, **kwargs)
+        else:
+            # the node was loaded headless, its node object and ports move over to the item
+            self.nodeObject = nodeModel.nodeObject
+            self.nodeObject.item = self
+            self._initFromModel(nodeModel)
 
         self.fillColor = QtGui.QColor(*self.getParamColor('fillColor'))
         self.borderColor = QtGui.QColor(*self.getParamColor('borderColor'))
 
         self.nodeObject.parameterValueChanged.connect(self._paramterValueChanged)
 
+    def _initFromModel(self, nodeModel):
+        pass
+
+    @classmethod
+    def getModelSize(cls, nodeModel):
+        """
+        size the item of a headless node will have, without creating the item
+        """
+        return cls.w, cls.h
+
+    @classmethod
+    def getModelPortPos(cls, nodeModel, port):
+        """
+        center of a port on the item of a headless node, relative to the node
+        """
+        w, h = cls.getModelSize(nodeModel)
+        return w * port.io, h / 2.0
+
     def getParamColor(self, param):
         color = self.parameter(param).getValue()
         return self.nodeObject.convertColorTo255(color)
@@ -88,73 +192,6 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
     def name(self):
         return self.nodeObject.name()
 
-    def _getInputsList(self):
-        inputs = []
-        for inputPort in self.getInputPorts():
-            if len(inputPort.getConnections()) > 0:
-                for outputPort in inputPort.getConnections():
-                    node = outputPort.node()
-                    inputs.append([inputPort.name, node.name(), outputPort.name])
-        return inputs
-
-    def _getOutputsList(self):
-        outputs = []
-        for outputPort in self.getOutputPorts():
-            if len(outputPort.getConnections()) > 0:
-                for inputPort in outputPort.getConnections():
-                    node = inputPort.node()
-                    outputs.append([outputPort.name, node.name(), inputPort.name])
-        return outputs
-
-    def toXmlElement(self):
-        from pyNodeGraph.core.parse._xml import ET
-
-        nodeElement = ET.Element('n')
-        nodeElement.set('n', self.parameter('name').getValue())
-        nodeElement.set('c', self.Class())
-
-        for paramName, param in self.nodeObject._parameters.items():
-            if paramName != 'name':
-                override = param.isOverride()
-                custom = param.isCustom()
-
-                if not (override or custom) and not self.nodeObject.hasProperty(paramName):
-                    continue
-
-                paramElement = param.toXmlElement()
-                nodeElement.append(paramElement)
-
-        inputs = self._getInputsList()
-        outputs = self._getOutputsList()
-
-        for outputName, nodeName, inputName in outputs:
-            outputElement = ET.Element('o')
-            outputElement.set('n', outputName)
-            outputElement.set('conN', nodeName)
-            outputElement.set('conP', inputName)
-            nodeElement.append(outputElement)
-
-        for inputName, nodeName, outputName in inputs:
-            inputElement = ET.Element('i')
-            inputElement.set('n', inputName)
-            inputElement.set('conN', nodeName)
-            inputElement.set('conP', outputName)
-            nodeElement.append(inputElement)
-
-        for key, value in self.nodeObject.getMetadatas().items():
-            metadataElement = ET.Element('m')
-            metadataElement.set('k', key)
-            metadataElement.set('v', value)
-            nodeElement.append(metadataElement)
-
-        return nodeElement
-
-    def toXml(self):
-        from pyNodeGraph.core.parse._xml import convertToString
-
-        element = self.toXmlElement()
-        return convertToString(element)
-
     @property
     def nodeType(self):
         return self.nodeObject.nodeType
@@ -204,6 +241,7 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
         if parameter.name() == 'name':
             self._updateNameText()
         if parameter.name() in ['fillColor', 'borderColor']:
+            self._highlight = None
             self.update()
         # self._updateUI()
 
@@ -222,6 +260,10 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
         for port in self.ports:
             port.setLabelVisible(visible)
 
+    def setPortsVisible(self, visible):
+        for port in self.ports:
+            port.setVisible(visible)
+
     def updateUI(self):
         self._updateUI()
 
@@ -234,6 +276,8 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
             self.panel.updateUI()
 
     def _portConnectionChanged(self, port):
+        if self.scene() is not None:
+            self.scene().invalidateExecutionPlan()
         if isinstance(port, ParameterInputPort):
             parameter = self.parameter(port.name)
             if parameter is None:
@@ -297,11 +341,13 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
     def addPort(self, port):
         port.setParentItem(self)
         self.ports.append(port)
-        port.portObj.connectChanged.connect(self._portConnectionChanged)
+        if self.scene() is not None and self.scene().lowDetail:
+            port.setVisible(False)
 
     def removePort(self, port):
         self.ports.remove(port)
         self.scene().removeItem(port)
+        self.scene().invalidateExecutionPlan()
 
     def addTag(self, name, tagItem, position=0.0):
         if name not in self.tags:
@@ -334,6 +380,7 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
             tag.setVisible(False)
 
     def setHighlight(self, value=True):
+        self._highlight = value
         self.fillColor = QtGui.QColor(*self.nodeObject.fillHighlightColor) if value else QtGui.QColor(*self.getParamColor('fillColor'))
         self.borderColor = QtGui.QColor(*self.nodeObject.borderHighlightColor) if value else QtGui.QColor(*self.getParamColor('borderColor'))
         if self.nameItem is not None:
@@ -357,12 +404,22 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
 
         return rect
 
+    def _updateHighlight(self):
+        # paint runs every frame, only compute the colors again when the selection changed
+        selected = self.isSelected()
+        if selected != self._highlight:
+            self.setHighlight(selected)
+
     def paint(self, painter, option, widget):
+        self._updateHighlight()
+        if self.scene().lowDetail:
+            painter.fillRect(self.boundingRect(), self.fillColor)
+            return
+
         if self.isSelected():
             penWidth = 2
         else:
             penWidth = 5
-        self.setHighlight(self.isSelected())
 
         pen = QtGui.QPen(self.borderColor)
         pen.setWidth(penWidth)
@@ -372,8 +429,9 @@ class _BaseNodeItem(QtWidgets.QGraphicsItem):
         painter.drawRoundedRect(self.x, self.y, self.w, self.h, self.roundness, self.roundness)
 
     def mouseMoveEvent(self, event):
-        self.scene().updateSelectedNodesPipe()
+        # move the selection first, then follow with the pipes in one pass
         super(_BaseNodeItem, self).mouseMoveEvent(event)
+        self.scene().updateSelectedNodesPipe()
         # slow
         # for n in self.scene().getSelectedNodes():
         #     n.parameter('x').setValue(n.scenePos().x())
@@ -395,10 +453,25 @@ class NodeItem(_BaseNodeItem):
     _nodeItemsMap = {}
     nodeItemType = 'NodeItem'
 
+    _labelUpdateItems = set()
+
+    @classmethod
+    def _updateLabels(cls):
+        items = cls._labelUpdateItems
+        cls._labelUpdateItems = set()
+        for item in items:
+            if item.scene() is not None:
+                item._updateLabelText()
+
+    @classmethod
+    def getItemClass(cls, nodeType):
+        nodeClass = Node.getNodeClass(nodeType)
+        return cls._nodeItemsMap.get(nodeClass.nodeItemType)
+
     @classmethod
     def createItem(cls, nodeType, **kwargs):
         nodeClass = Node.getNodeClass(nodeType)
-        nodeItemClass = cls._nodeItemsMap.get(nodeClass.nodeItemType)
+        nodeItemClass = cls.getItemClass(nodeType)
         item = nodeItemClass(nodeClass, **kwargs)
         return item
 
@@ -422,37 +495,36 @@ class NodeItem(_BaseNodeItem):
         super(NodeItem, self)._initUI()
 
         self.labelItem = None
+        self._labelHtml = None
+        self._labelFontSize = None
+
+    def _getLabelTemplate(self):
+        return LabelTemplate.get(self.parameter('label').getValue())
 
     def _updateLabelText(self):
         if self.labelItem is None:
             return
 
-        label = self.parameter('label').getValue()
+        label = self._getLabelTemplate().render(self)
         labelFontSize = self.parameter('labelFontSize').getValue()
 
-        expStrings = re.findall(EXPRESSION_VALUE_PATTERN, label)
-        for expString in expStrings:
-            paramName = ' '.join(expString.split(' ')[1:]).replace(']', '')
-            param = self.parameter(paramName)
-            if param is not None:
-                paramValue = param.getValue()
-                label = label.replace(expString, str(paramValue))
-
-        expStrings = re.findall(EXPRESSION_PYTHON_PATTERN, label)
-        for expString in expStrings:
-            pyString = ' '.join(expString.split(' ')[1:]).replace(']', '')
-            try:
-                result = eval(pyString, globals(), Node._expressionMap)
-            except(Exception) as e:
-                result = e
-            label = label.replace(expString, str(result))
-
-        label = label.replace('\n', '<p>')
+        if label == self._labelHtml and labelFontSize == self._labelFontSize:
+            return
+        self._labelHtml = label
         self.labelItem.setHtml(label)
-        font = QtGui.QFont('Arial', labelFontSize)
-        self.labelItem.setFont(font)
+        if labelFontSize != self._labelFontSize:
+            self._labelFontSize = labelFontSize
+            self.labelItem.setFont(QtGui.QFont('Arial', labelFontSize))
         self._updateLabelPos()
 
+    def _requestLabelUpdate(self):
+        # a hidden label is refreshed by setLabelVisible when shown again
+        if self.labelItem is None or not self.labelItem.isVisible():
+            return
+        if len(NodeItem._labelUpdateItems) == 0:
+            QtCore.QTimer.singleShot(LABEL_UPDATE_INTERVAL, NodeItem._updateLabels)
+        NodeItem._labelUpdateItems.add(self)
+
     def _updateLabelPos(self):
         rect = self.labelItem.boundingRect()
         self.labelItem.setX((self.w - rect.width()) / 2.0)
@@ -471,8 +543,8 @@ class NodeItem(_BaseNodeItem):
 
     def _paramterValueChanged(self, parameter):
         super(NodeItem, self)._paramterValueChanged(parameter)
-        if parameter.name() == 'label':
-            self._updateLabelText()
+        if parameter.name() in self._getLabelTemplate().params:
+            self._requestLabelUpdate()
 
     def _updateUI(self):
         super(NodeItem, self)._updateUI()
@@ -480,6 +552,33 @@ class NodeItem(_BaseNodeItem):
         self._updateNameText()
         self._updateLabelText()
 
+    def _initFromModel(self, nodeModel):
+        for port in nodeModel.ports:
+            if port.parameterPort and port.io == 0:
+                self.addParameterInputPort(port.name, label=port.label, dataType=port.dataType)
+            elif port.parameterPort:
+                self.addParameterOutputPort(port.name, label=port.label, dataType=port.dataType)
+            elif port.io == 0:
+                self.addFlowInputPort(port.name)
+            else:
+                self.addFlowOutputPort(port.name)
+
+    @classmethod
+    def getModelSize(cls, nodeModel):
+        inputsNum = len(nodeModel.getInputPorts())
+        outputsNum = len(nodeModel.getOutputPorts())
+        return cls.w, NODE_HEIGHT_BASE + PORT_SPACING * max(inputsNum, outputsNum)
+
+    @classmethod
+    def getModelPortPos(cls, nodeModel, port):
+        # same layout as updateFlowPortsPos and updateParameterPortsPos
+        flowPorts = [p for p in nodeModel.ports if p.io == port.io and not p.parameterPort]
+        if not port.parameterPort:
+            return cls.w * port.io, 10 + flowPorts.index(port) * PORT_SPACING + FlowInputPort.h / 2.0
+        parameterPorts = [p for p in nodeModel.ports if p.io == port.io and p.parameterPort]
+        y = (len(flowPorts) + parameterPorts.index(port) + 1) * PORT_SPACING
+        return cls.w * port.io, y + ParameterInputPort.h / 2.0
+
     def _updateHeight(self):
         inputsNum = len(self.inputParameterPorts) + len(self.inputFlowPorts)
         outputsNum = len(self.outputParameterPorts) + len(self.outputFlowPorts)
@@ -605,7 +704,7 @@ class NodeItem(_BaseNodeItem):
 
         connectedPipes = []
         for port in self.ports:
-            connectedPipes.extend(port.pipes)
+            connectedPipes.extend(port.connections)
 
         if len(self.inputFlowPorts) != 0 and len(connectedPipes) == 0:
             # if already has connect, don't find other pipe
@@ -631,6 +730,18 @@ class DotNodeItem(NodeItem):
         self.initPorts()
         self.setDotPorts()
 
+    def _initFromModel(self, nodeModel):
+        # the same i, o ports are made by initPorts
+        pass
+
+    @classmethod
+    def getModelSize(cls, nodeModel):
+        return cls.w, cls.h
+
+    @classmethod
+    def getModelPortPos(cls, nodeModel, port):
+        return cls.w * port.io, cls.h / 2.0
+
     def initPorts(self):
         self.inputPort = InputPort(name='i', dataType=Parameter)
         self.outputPort = OutputPort(name='o', dataType=Parameter)
@@ -661,7 +772,7 @@ class DotNodeItem(NodeItem):
 
         connectedPipes = []
         for port in self.ports:
-            connectedPipes.extend(port.pipes)
+            connectedPipes.extend(port.connections)
 
         if len(connectedPipes) == 0:
             # if already has connect, don't find other pipe
@@ -748,6 +859,15 @@ class BackdropNodeItem(NodeItem):
         self.selectStart = QtCore.QPointF(0, 0)
         self.roundness = 0
 
+    def _initFromModel(self, nodeModel):
+        super(BackdropNodeItem, self)._initFromModel(nodeModel)
+        self.w = nodeModel.w
+        self.h = nodeModel.h
+
+    @classmethod
+    def getModelSize(cls, nodeModel):
+        return nodeModel.w, nodeModel.h
+
     def setSizerPos(self):
         x = self.w - self._sizer.size
         y = self.h - self._sizer.size
@@ -811,6 +931,8 @@ class BackdropNodeItem(NodeItem):
         if self.scene():
             polygon = self.mapToScene(self.boundingRect())
             rect = polygon.boundingRect()
+            # nodes in the backdrop without item yet get one, to be moved and selected with it
+            self.scene().createNodeItemsInRect(rect)
             items = self.scene().items(rect, mode=mode[inc_intersects])
             for item in items:
                 if item == self or item == self._sizer:
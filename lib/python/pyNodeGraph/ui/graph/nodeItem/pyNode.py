@@ -5,6 +5,7 @@ from pyNodeGraph.module.sqt import QtGui
 
 class PyNodeItem(NodeItem):
     nodeItemType = 'PyNodeItem'
+    _highlightError = False
 
     def addFlowPorts(self, flowPorts):
         for d in flowPorts:
@@ -17,9 +18,15 @@ class PyNodeItem(NodeItem):
 
     def setHighlight(self, value=True):
         super(PyNodeItem, self).setHighlight(value)
+        self._highlightError = self.nodeObject.hasError
         if self.nodeObject.hasError:
             self.fillColor = QtGui.QColor(250, 0, 0)
 
+    def _updateHighlight(self):
+        if self.nodeObject.hasError != self._highlightError:
+            self._highlight = None
+        super(PyNodeItem, self)._updateHighlight()
+
 
 class ForNodeItem(PyNodeItem):
     nodeItemType = 'ForNodeItem'
@@ -19,6 +19,7 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, False)
         self.setAcceptHoverEvents(True)
         self.setAcceptDrops(True)
+        self.setZValue(-1)
 
         self.lineColor = self.normalColor
         self.thickness = 1.5
@@ -37,6 +38,12 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         self.curv2 = 0.0
         self.curv4 = 1.0
 
+        # straight line drawn instead of the curve when zoomed out
+        self._line = QtCore.QLineF()
+        # end points of the current path, the path is only built again when one of them moved
+        self._sourcePos = None
+        self._targetPos = None
+
     def setLineColor(self, highlight=False, color=None):
         if color is not None:
             self.lineColor = color
@@ -55,6 +62,10 @@ class Pipe(QtWidgets.QGraphicsPathItem):
             targetPos = self.target.mapToScene(self.target.boundingRect().center())
         if sourcePos is None or targetPos is None:
             return
+        if sourcePos == self._sourcePos and targetPos == self._targetPos:
+            return
+        self._sourcePos = sourcePos
+        self._targetPos = targetPos
 
         path = QtGui.QPainterPath()
         path.moveTo(sourcePos)
@@ -94,6 +105,7 @@ class Pipe(QtWidgets.QGraphicsPathItem):
 
         path.cubicTo(ctrl1, ctrl2, targetPos)
         self.setPath(path)
+        self._line = QtCore.QLineF(sourcePos, targetPos)
 
     def breakConnection(self):
         if self.source is not None:
@@ -109,18 +121,22 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         del self
 
     def paint(self, painter, option, widget):
-        zoom = self.scene().views()[0].currentZoom
-        thickness = self.thickness / math.sqrt(zoom)
-        pointAtLength = self.pointAtLength / math.sqrt(zoom)
+        scene = self.scene()
+        color = PIPE_HIGHTLIGHT_COLOR if self.isSelected() else self.lineColor
 
-        if self.isSelected():
-            pen = QtGui.QPen(PIPE_HIGHTLIGHT_COLOR, thickness)
-        else:
-            pen = QtGui.QPen(self.lineColor, thickness)
+        if scene.lowDetail:
+            # cosmetic one pixel line, no curve and arrow
+            painter.setPen(QtGui.QPen(color, 0))
+            painter.drawLine(self._line)
+            return
+
+        thickness = self.thickness * scene.pipeScale
+        pointAtLength = self.pointAtLength * scene.pipeScale
+
+        pen = QtGui.QPen(color, thickness)
         if self.lineStyle is not None:
             pen.setStyle(self.lineStyle)
         self.setPen(pen)
-        self.setZValue(-1)
         super(Pipe, self).paint(painter, option, widget)
 
         center_pos = self.path().pointAtPercent(0.5)
@@ -10,18 +10,6 @@ PORT_SIZE = 10
 PORT_LABEL_COLOR = QtGui.QColor(200, 200, 200)
 
 
-class PortObject(QtCore.QObject):
-    connectChanged = QtCore.Signal(object)
-
-    def __init__(self, item=None, *args, **kwargs):
-        super(PortObject, self).__init__(*args, **kwargs)
-
-        self._item = item
-
-    def _connectChanged(self):
-        self.connectChanged.emit(self._item)
-
-
 class Port(QtWidgets.QGraphicsEllipseItem):
     orientation = 0
     x = 0
@@ -41,11 +29,12 @@ class Port(QtWidgets.QGraphicsEllipseItem):
     def __init__(self, name='input', label=None, dataType=None, **kwargs):
         super(Port, self).__init__(**kwargs)
 
-        self.portObj = PortObject(self)
         self.name = name
         self.dataType = dataType
         self.label = label if label is not None else name
         self.pipes = []
+        # the pipes and the connections to nodes without item yet, in the order they were made
+        self.connections = []
 
         self.findingPort = False
         self.foundPort = None
@@ -129,21 +118,33 @@ class Port(QtWidgets.QGraphicsEllipseItem):
 
     def addPipe(self, pipe, emitSignal=True):
         self.pipes.append(pipe)
+        self.connections.append(pipe)
         if emitSignal:
-            self.portObj._connectChanged()
+            self._connectChanged()
 
     def removePipe(self, pipe):
-        if pipe in self.pipes:
-            self.pipes.remove(pipe)
-            self.portObj._connectChanged()
+        if pipe in self.connections:
+            self.connections.remove(pipe)
+            if pipe in self.pipes:
+                self.pipes.remove(pipe)
+            self._connectChanged()
+
+    def _connectChanged(self):
+        # no QObject per port, tell the node directly like the headless PortModel
+        node = self.node()
+        if node is not None:
+            node._portConnectionChanged(self)
 
     def _checkConnectionNumber(self):
         if self.maxConnections is None:
             return
-        if len(self.pipes) == self.maxConnections:
-            pipe = self.pipes[0]
-            self.removePipe(pipe)
-            pipe.breakConnection()
+        if len(self.connections) == self.maxConnections:
+            pipe = self.connections[0]
+            if pipe in self.pipes:
+                self.removePipe(pipe)
+                pipe.breakConnection()
+            else:
+                self.scene().removeEdge(pipe)
 
     def boundingRect(self):
         rect = QtCore.QRectF(
@@ -164,10 +165,13 @@ class Port(QtWidgets.QGraphicsEllipseItem):
         self._updateUI()
 
     def destroy(self):
-        pipesToDelete = self.pipes[::]  # Avoid shrinking during deletion.
+        pipesToDelete = self.connections[::]  # Avoid shrinking during deletion.
         for pipe in pipesToDelete:
-            self.removePipe(pipe)
-            self.scene().removeItem(pipe)
+            if pipe in self.pipes:
+                self.removePipe(pipe)
+                self.scene().removeItem(pipe)
+            else:
+                self.scene().removeEdge(pipe)
         node = self.node()
         if node:
             node.removePort(self)
@@ -285,7 +289,7 @@ class InputPort(Port):
         )
 
     def getConnections(self):
-        return [pipe.source for pipe in self.pipes if pipe.target == self and pipe.source is not None]
+        return [pipe.source for pipe in self.connections if pipe.target == self and pipe.source is not None]
 
 
 class OutputPort(Port):
@@ -300,10 +304,11 @@ class OutputPort(Port):
         )
 
     def getConnections(self):
-        return [pipe.target for pipe in self.pipes if pipe.source == self]
+        return [pipe.target for pipe in self.connections if pipe.source == self]
 
 
 class FlowData(Parameter):
+    __slots__ = ()
     parameterTypeString = '<>'
 
 
@@ -31,6 +31,11 @@ class PixmapTag(QtWidgets.QGraphicsPixmapItem):
         ))
         self.setScale(1.0 / self.scaleFactor)
 
+    def paint(self, painter, option, widget):
+        if self.scene().lowDetail:
+            return
+        super(PixmapTag, self).paint(painter, option, widget)
+
 
 class LockTag(PixmapTag):
     def __init__(self, **kwargs):
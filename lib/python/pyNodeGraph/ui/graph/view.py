@@ -1,20 +1,30 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import re
+import math
 import json
 import time
+import shutil
+import tempfile
 from pyNodeGraph.module.sqt import *
 from pyNodeGraph.utils.const import VIEWPORT_FULL_UPDATE
 from pyNodeGraph.core.node import Node
 from pyNodeGraph.utils.log import get_logger, log_cost_time
 from pyNodeGraph.core.state import GraphState
-from pyNodeGraph.core.parse._xml import ET, convertToString
+from pyNodeGraph.core.parse._xml import ET, XmlWriter
+from pyNodeGraph.core.parse.binary import BINARY_EXTENSION, writeBinary
+from pyNodeGraph.core.parse.loader import NodesXmlLoader
+from pyNodeGraph.core.graph.plan import WithExecutionPlan
+from pyNodeGraph.core.graph.index import NodesIndex, GridIndex
+from pyNodeGraph.core.graph.graph import Graph
 from pyNodeGraph.utils.res import resource
 from pyNodeGraph.ui.utils.menu import WithMenuObject
 from pyNodeGraph.ui.utils.drop import DropWidget
+from .const import LOW_DETAIL_ZOOM
 from .nodeItem import NodeItem
-from .other.pipe import Pipe
+from .other.pipe import Pipe, ParameterPipe
 from .other.port import Port
 
 
@@ -33,6 +43,9 @@ VIEW_GRID_HEIGHT = 100
 
 VIEW_ZOOM_STEP = 1.1
 
+# size of the grid cells headless nodes are looked up by when they come into view
+NODES_GRID_CELL_SIZE = 1000
+
 
 class FloatLineEdit(QtWidgets.QFrame):
     editFinished = QtCore.Signal(str)
@@ -88,6 +101,15 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
         self.panning = False
         self.keyZooming = False
         self.clickedPos = QtCore.QPoint(0, 0)
+        self._showPortLabel = False
+        self._labelRect = QtCore.QRectF()
+        # nodes showing their labels, with their scene rect at the last update
+        self._labelNodes = {}
+        self._highlightPipes = set()
+        self._highlightPending = False
+        self._gridLines = []
+        self._gridLinesKey = None
+        self._modelColors = {}
 
         self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
@@ -103,6 +125,18 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
         self._createNewFloatEdit.setVisible(False)
 
         self._createNewFloatEdit.editFinished.connect(self._floatEditFinished)
+        self.rubberBandChanged.connect(self._rubberBandChanged)
+
+    def setScene(self, scene):
+        super(GraphicsView, self).setScene(scene)
+        scene.selectionChanged.connect(self._selectionChanged)
+        scene.nodeDeleted.connect(self._nodeDeleted)
+
+    def _nodeDeleted(self, node):
+        self._labelNodes.pop(node, None)
+
+    def clearLabelNodes(self):
+        self._labelNodes = {}
 
     def dragEnterEvent(self, QDragEnterEvent):
         DropWidget.dragEnterEvent(self, QDragEnterEvent)
@@ -119,11 +153,20 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
     def afterFilesDrop(self, acceptFiles):
         pass
 
+    def resizeEvent(self, event):
+        super(GraphicsView, self).resizeEvent(event)
+        if self.scene() is not None:
+            self._resizeScene()
+
     def _zoom(self, zoom):
         self.scale(zoom, zoom)
-        self.currentZoom = self.transform().m11()
+        self._updateCurrentZoom()
         self._resizeScene()
 
+    def _updateCurrentZoom(self):
+        self.currentZoom = self.transform().m11()
+        self.scene().setLevelOfDetail(self.currentZoom)
+
     def getCenterPos(self):
         center = self.mapToScene(QtCore.QPoint(
             self.viewport().width() / 2,
@@ -136,18 +179,40 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
         w = self.viewport().width() / self.currentZoom * 2 + 25000
         h = self.viewport().height() / self.currentZoom * 2 + 25000
 
-        self.scene().setSceneRect(QtCore.QRectF(
-            center.x() - w / 2,
-            center.y() - h / 2,
-            w,
-            h
-        ))
+        # a new scene rect makes the scene rebuild its bsp index, only move it when the view gets near the border
+        viewRect = QtCore.QRectF(center.x() - w / 4, center.y() - h / 4, w / 2, h / 2)
+        if not self.scene().sceneRect().contains(viewRect):
+            self.scene().setSceneRect(QtCore.QRectF(
+                center.x() - w / 2,
+                center.y() - h / 2,
+                w,
+                h
+            ))
 
         self._setAntialiasing()
+        self._createNodeItems()
 
         if setLabel:
             self._setLabelVisible()
 
+    def _createNodeItems(self):
+        """
+        nodes opened from a file get their items when they come in or near the viewport.
+        zoomed out they are painted by the view instead, see _drawNodeModels.
+        """
+        if self.currentZoom < LOW_DETAIL_ZOOM:
+            return
+        rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        w = rect.width() / 2
+        h = rect.height() / 2
+        self.scene().createNodeItemsInRect(rect.adjusted(-w, -h, w, h))
+
+    def _rubberBandChanged(self, rubberBandRect, fromScenePoint, toScenePoint):
+        # the nodes in the band need items to be selected
+        if rubberBandRect.isNull():
+            return
+        self.scene().createNodeItemsInRect(QtCore.QRectF(fromScenePoint, toScenePoint).normalized())
+
     def _setAntialiasing(self):
         antialiasing = True if self.currentZoom >= 0.1 else False
         self.setRenderHint(QtGui.QPainter.Antialiasing, antialiasing)
@@ -160,11 +225,39 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
         point2 = self.mapToScene(QtCore.QPoint(self.viewport().width(), self.viewport().height()))
         rect = QtCore.QRectF(point1, point2)
 
-        for node in self.scene().allNodes():
-            node.setLabelVisible(showNodeLabel and rect.contains(node.pos()))
+        # query the scene's bsp index for the viewport, only nodes entering or leaving it are updated.
+        # zoomed out nothing shows labels, no need to look up the items at all.
+        scene = self.scene()
+        visibleNodes = set()
+        if showNodeLabel:
+            # a node with its top left on the border doesn't intersect rect, look a bit wider
+            for item in scene.items(rect.adjusted(-1, -1, 1, 1)):
+                if isinstance(item, NodeItem) and rect.contains(item.pos()):
+                    visibleNodes.add(item)
+
+        for node in set(self._labelNodes) - visibleNodes:
+            node.setLabelVisible(False)
+            node.setPortsLabelVisible(False)
+
+        portLabelChanged = showPortLabel != self._showPortLabel
+        labelNodes = {}
+        for node in visibleNodes:
+            nodeRect = node.mapRectToScene(node.childrenBoundingRect() | node.boundingRect())
+            labelNodes[node] = nodeRect
+            lastRect = self._labelNodes.get(node)
+            if lastRect is None:
+                node.setLabelVisible(True)
+            elif not portLabelChanged and lastRect == nodeRect:
+                if rect.contains(nodeRect) and self._labelRect.contains(nodeRect):
+                    # not moved and inside before and now, none of its ports crossed the viewport border
+                    continue
             for port in node.ports:
                 port.setLabelVisible(showPortLabel and rect.contains(port.scenePos()))
 
+        self._labelNodes = labelNodes
+        self._labelRect = rect
+        self._showPortLabel = showPortLabel
+
     def focusNextPrevChild(self, bool):
         return False
 
@@ -176,19 +269,21 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
 
     def fitTo(self, items=[]):
         if len(items) == 0:
-            for item in self.scene().items():
-                if isinstance(item, NodeItem):
-                    items.append(item)
-
-        max_x = items[0].pos().x()
-        min_x = items[0].pos().x()
-        max_y = items[0].pos().y()
-        min_y = items[0].pos().y()
+            # nodes without item too
+            items = self.scene().allNodes()
+        if len(items) == 0:
+            return
+
+        max_x = items[0].scenePos().x()
+        min_x = items[0].scenePos().x()
+        max_y = items[0].scenePos().y()
+        min_y = items[0].scenePos().y()
         for item in items:
-            max_x = max(item.pos().x(), max_x)
-            min_x = min(item.pos().x(), min_x)
-            max_y = max(item.pos().y(), max_y)
-            min_y = min(item.pos().y(), min_y)
+            pos = item.scenePos()
+            max_x = max(pos.x(), max_x)
+            min_x = min(pos.x(), min_x)
+            max_y = max(pos.y(), max_y)
+            min_y = min(pos.y(), min_y)
         center_x = (max_x + min_x) / 2 + 100
         center_y = (max_y + min_y) / 2 + 40
         width = max_x - min_x
@@ -198,16 +293,21 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
         zoom_y = 1 / max(1, float(height + 1000) / self.viewport().height()) / self.currentZoom
         zoom = min(zoom_x, zoom_y)
         self.scale(zoom, zoom)
-        self.currentZoom = self.transform().m11()
-        self._resizeScene()
+        self._updateCurrentZoom()
+        self._resizeScene(setLabel=False)
 
         self.centerOn(QtCore.QPointF(center_x, center_y))
+        self._resizeScene()
 
     def mousePressEvent(self, event):
         """Initiate custom panning using middle mouse button."""
         selectedItems = self.scene().selectedItems()
         self.clickedPos = event.pos()
 
+        # a click on a node painted by the view gives it its item first
+        scenePos = self.mapToScene(event.pos())
+        self.scene().createNodeItemsInRect(QtCore.QRectF(scenePos.x() - 1, scenePos.y() - 1, 2, 2))
+
         if self.panning:
             if event.button() == QtCore.Qt.RightButton:
                 self.keyZooming = True
@@ -227,7 +327,6 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
         if event.button() == QtCore.Qt.MiddleButton:
             for item in selectedItems:
                 item.setSelected(True)
-        self._highlightConnection()
 
     def mouseMoveEvent(self, event):
         if self.keyZooming:
@@ -261,6 +360,7 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
 
         super(GraphicsView, self).mouseReleaseEvent(event)
 
+        # pipes dragged from a port don't change the selection
         self._highlightConnection()
         self.clickedPos = event.pos()
         self._resizeScene()
@@ -296,50 +396,127 @@ class GraphicsView(QtWidgets.QGraphicsView, DropWidget, WithMenuObject):
 
         painter.drawLines(lines)
 
+    def _getGridLines(self, cellW, cellH, columns, rows):
+        """
+        grid lines of a block of cells in scene units starting at 0, 0, moved to the exposed cells when drawn.
+        only made again when the number of cells in the view changes, not while panning.
+        """
+        key = (cellW, cellH, columns, rows)
+        if self._gridLinesKey != key:
+            w = columns * cellW
+            h = rows * cellH
+            lines = [QtCore.QLineF(0, i * cellH, w, i * cellH) for i in range(rows + 1)]
+            lines.extend(QtCore.QLineF(i * cellW, 0, i * cellW, h) for i in range(columns + 1))
+            self._gridLines = lines
+            self._gridLinesKey = key
+        return self._gridLines
+
     def drawBackground(self, painter, rect):
+        scale = max(int(1 / self.currentZoom / 2), 1)
+        cellW = VIEW_GRID_WIDTH * scale
+        cellH = VIEW_GRID_HEIGHT * scale
+        columns = int(self.viewport().width() / self.currentZoom / cellW) + 2
+        rows = int(self.viewport().height() / self.currentZoom / cellH) + 2
+
         pen = QtGui.QPen(VIEW_LINE_COLOR)
         pen.setCosmetic(True)
+        painter.fillRect(rect, VIEW_FILL_COLOR)
+        painter.save()
         painter.setPen(pen)
-        painter.setBrush(QtGui.QBrush(VIEW_FILL_COLOR))
+        # drawn in scene units through the view transform, the lines stay on the grid at any zoom
+        painter.translate(math.floor(rect.x() / cellW) * cellW, math.floor(rect.y() / cellH) * cellH)
+        painter.drawLines(self._getGridLines(cellW, cellH, columns, rows))
+        painter.restore()
 
-        painter.drawRect(rect)
-        lines = []
-        scale = max(int(1 / self.currentZoom / 2), 1)
-        line_w = VIEW_GRID_WIDTH * scale
-        line_h = VIEW_GRID_HEIGHT * scale
+        painter.setPen(QtGui.QPen(VIEW_CENTER_LINE_COLOR))
+        painter.drawLine(QtCore.QLineF(QtCore.QPointF(rect.x(), 0), QtCore.QPointF(rect.x() + rect.width(), 0)))
+        painter.drawLine(QtCore.QLineF(QtCore.QPointF(0, rect.y()), QtCore.QPointF(0, rect.y() + rect.height())))
+
+        self._drawNodeModels(painter, rect)
+
+    def _getModelColorKey(self, node):
+        nodeObject = node.nodeObject
+        if getattr(nodeObject, 'hasError', False):
+            return 'error'
+        return nodeObject.__class__, tuple(node.parameter('fillColor').getValue())
+
+    def _getModelColor(self, key):
+        color = self._modelColors.get(key)
+        if color is None:
+            if key == 'error':
+                color = QtGui.QColor(250, 0, 0)
+            else:
+                nodeClass, fillColor = key
+                color = QtGui.QColor(*nodeClass.convertColorTo255(fillColor))
+            self._modelColors[key] = color
+        return color
+
+    def _getEdgeModelPoint(self, port):
+        if isinstance(port, Port):
+            return port.mapToScene(port.boundingRect().center())
+        node = port.node()
+        x, y, w, h = self.scene().getNodeModelRect(node)
+        portX, portY = NodeItem.getItemClass(node.Class()).getModelPortPos(node, port)
+        return QtCore.QPointF(x + portX, y + portY)
+
+    def _drawNodeModels(self, painter, rect):
+        """
+        nodes without item painted like the low detail items, a flat rect, and straight lines for their connections
+        """
+        scene = self.scene()
+        nodes = scene.getNodeModels(rect)
+        edges = scene.getEdgeModels(rect)
+        if len(nodes) == 0 and len(edges) == 0:
+            return
 
-        point1 = self.mapToScene(QtCore.QPoint(0, 0))
-        point2 = self.mapToScene(QtCore.QPoint(self.viewport().width(), self.viewport().height()))
+        lines = []
+        parameterLines = []
+        for edge in edges:
+            port = edge.target if isinstance(edge.source, Port) else edge.source
+            line = QtCore.QLineF(self._getEdgeModelPoint(edge.source), self._getEdgeModelPoint(edge.target))
+            if port.parameterPort:
+                parameterLines.append(line)
+            else:
+                lines.append(line)
 
-        for i in range(int(point1.y() / line_h), int(point2.y() / line_h) + 1):
-            lines.append(QtCore.QLineF(
-                QtCore.QPoint(rect.x(), i * line_h),
-                QtCore.QPoint(rect.x() + rect.width(), i * line_h)
-            ))
+        rects = {}
+        for node in nodes:
+            rects.setdefault(self._getModelColorKey(node), []).append(QtCore.QRectF(*scene.getNodeModelRect(node)))
 
-        for i in range(int(point1.x() / line_w), int(point2.x() / line_w) + 1):
-            lines.append(QtCore.QLineF(
-                QtCore.QPoint(i * line_w, rect.y()),
-                QtCore.QPoint(i * line_w, rect.y() + rect.height())
-            ))
+        painter.save()
+        painter.setPen(QtGui.QPen(Pipe.normalColor, 0))
         painter.drawLines(lines)
-
-        painter.setPen(QtGui.QPen(VIEW_CENTER_LINE_COLOR))
-        painter.drawLine(QtCore.QLineF(QtCore.QPoint(rect.x(), 0), QtCore.QPoint(rect.x() + rect.width(), 0)))
-        painter.drawLine(QtCore.QLineF(QtCore.QPoint(0, rect.y()), QtCore.QPoint(0, rect.y() + rect.height())))
+        painter.setPen(QtGui.QPen(ParameterPipe.normalColor, 0))
+        painter.drawLines(parameterLines)
+        painter.setPen(QtCore.Qt.NoPen)
+        for key, keyRects in rects.items():
+            painter.setBrush(self._getModelColor(key))
+            painter.drawRects(keyRects)
+        painter.restore()
 
     def _highlightConnection(self):
-        for item in self.scene().items():
-            if isinstance(item, Port):
-                for pipe in item.pipes:
-                    pipe.setLineColor(highlight=False)
-            # if isinstance(item, NodeItem):
-            #     item.setHighlight(False)
+        self._highlightPending = False
+        pipes = set()
         for item in self.scene().selectedItems():
             if isinstance(item, NodeItem):
                 for port in item.ports:
-                    for pipe in port.pipes:
-                        pipe.setLineColor(highlight=True)
+                    pipes.update(port.pipes)
+
+        # only recolor the pipes that changed
+        for pipe in self._highlightPipes - pipes:
+            pipe.setLineColor(highlight=False)
+            if pipe.scene() is not None:
+                pipe.update()
+        for pipe in pipes - self._highlightPipes:
+            pipe.setLineColor(highlight=True)
+            pipe.update()
+        self._highlightPipes = pipes
+
+    def _selectionChanged(self):
+        # selecting many nodes emits once per node, highlight once when back in the event loop
+        if not self._highlightPending:
+            self._highlightPending = True
+            QtCore.QTimer.singleShot(0, self._highlightConnection)
 
     def showFloatEdit(self):
         self._createNewFloatEdit.move(self.clickedPos)
@@ -453,10 +630,25 @@ class GraphicsSceneWidget(QtWidgets.QWidget):
         self.scene.execute()
 
 
-class GraphicsScene(QtWidgets.QGraphicsScene):
+class SceneGraph(Graph):
+    """
+    headless graph a scene opens its file with, the nodes are handed over to the scene
+    which creates their items when they come into view.
+    """
+
+    def __init__(self, scene):
+        super(SceneGraph, self).__init__()
+        self._scene = scene
+
+    def getXmlRootOffset(self, rootElement):
+        return self._scene.getXmlRootOffset(rootElement)
+
+
+class GraphicsScene(QtWidgets.QGraphicsScene, NodesXmlLoader, WithExecutionPlan):
     enterFileRequired = QtCore.Signal(str)
     nodeParameterChanged = QtCore.Signal(object)
     nodeDeleted = QtCore.Signal(object)
+    loadProgressChanged = QtCore.Signal(float)
 
     def __init__(self, view=None, **kwargs):
         super(GraphicsScene, self).__init__(**kwargs)
@@ -465,9 +657,17 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
 
         self.path = None
 
-        self._allNodes = {}
+        self._nodesIndex = NodesIndex()
         self._nodesSuffix = {}
         self._primNodes = {}
+        # nodes opened from a file without item yet, their connections not made into pipes yet,
+        # and the grid cells all nodes and connections of have been given items and pipes
+        self._nodesGrid = GridIndex(NODES_GRID_CELL_SIZE)
+        self._edgesGrid = GridIndex(NODES_GRID_CELL_SIZE)
+        self._itemCells = set()
+
+        self.lowDetail = False
+        self.pipeScale = 1.0
 
         self.setSceneRect(QtCore.QRectF(-25000 / 2, -25000 / 2, 25000, 25000))
 
@@ -478,18 +678,28 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
             node.connectToNode(upNode)
 
     def getRootNode(self):
-        nodes = self.getNodes(type='Main')
-        if len(nodes) == 0:
-            return
-        return nodes[0]
+        for node in self._nodesIndex.getByType('Main'):
+            return node
+
+    def setLevelOfDetail(self, zoom):
+        """
+        set by the view when the zoom changes, items read it in paint instead of asking the view every time
+        """
+        self.pipeScale = 1.0 / math.sqrt(zoom)
+        lowDetail = zoom < LOW_DETAIL_ZOOM
+        if lowDetail != self.lowDetail:
+            self.lowDetail = lowDetail
+            # hidden ports are skipped by the scene, not even asked for their bounding rect
+            for node in self.iterNodes():
+                if isinstance(node, NodeItem):
+                    node.setPortsVisible(not lowDetail)
 
     def _afterNodeNameChanged(self, node):
-        self._allNodes[node] = node.name()
+        self._nodesIndex.rename(node, node.name())
+        self.invalidateExecutionPlan()
 
     def _getUniqueName(self, name):
-        # nodes = self.allNodes()
-        # names = [n.name() for n in nodes]
-        names = list(self._allNodes.values())
+        names = self._nodesIndex
 
         match = re.match(NODE_NAME_PATTERN, name)
         if match:
@@ -525,17 +735,150 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
             self.deleteNode(node)
         super(GraphicsScene, self).clear()
 
+    def _loadProgress(self, nodesCount, fraction):
+        self.loadProgressChanged.emit(fraction)
+        # keep the ui responsive between chunks, without letting the user edit a half loaded scene
+        QtWidgets.QApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
+
     def _loadSceneFromUng(self, ungFile):
-        with open(ungFile, 'r') as f:
-            xmlString = f.read()
-        self.pasteNodesFromXml(xmlString, selected=False)
+        # nodes are loaded headless, they get their items when they come into view
+        graph = SceneGraph(self)
+        graph.createNodesFromFile(ungFile, progress=self._loadProgress)
+        self._addNodeModels(graph.allNodes())
+
+    def _addNodeModels(self, nodes):
+        for node in nodes:
+            node._graph = self
+            nodeName, suffix, index = self._getUniqueName(node.name())
+            self._nodesIndex.add(node, nodeName)
+            self._nodesSuffix.setdefault(suffix, []).append(index)
+            w, h = NodeItem.getItemClass(node.Class()).getModelSize(node)
+            pos = node.scenePos()
+            self._nodesGrid.add(node, (pos.x(), pos.y(), w, h))
+
+        for node in nodes:
+            for port in node.getOutputPorts():
+                for edge in port.pipes:
+                    self._edgesGrid.add(edge, self._getEdgeModelRect(edge))
+        self._itemCells = set()
+
+    def _getEdgeModelRect(self, edge):
+        x1, y1, w1, h1 = self._nodesGrid.getRect(edge.source.node())
+        x2, y2, w2, h2 = self._nodesGrid.getRect(edge.target.node())
+        x = min(x1, x2)
+        y = min(y1, y2)
+        return x, y, max(x1 + w1, x2 + w2) - x, max(y1 + h1, y2 + h2) - y
+
+    def getNodeModelRect(self, node):
+        return self._nodesGrid.getRect(node)
+
+    def _getGridCells(self, rect):
+        return self._nodesGrid.getCells(rect.x(), rect.y(), rect.width(), rect.height())
+
+    def getNodeModels(self, rect):
+        return self._nodesGrid.get(self._getGridCells(rect))
+
+    def getEdgeModels(self, rect):
+        return self._edgesGrid.get(self._getGridCells(rect))
+
+    def createNodeItemsInRect(self, rect):
+        """
+        create the items of the nodes in the rect that have none, and of the nodes at the other end of their
+        connections and of connections crossing the rect, so all pipes in the rect are drawn.
+        """
+        cells = [cell for cell in self._getGridCells(rect) if cell not in self._itemCells]
+        if len(cells) == 0:
+            return
+        self._itemCells.update(cells)
+
+        # a connection is in every cell of the rect around both of its nodes
+        nodes = list(self._nodesGrid.get(cells))
+        for edge in list(self._edgesGrid.get(cells)):
+            nodes.append(edge.source.node())
+            nodes.append(edge.target.node())
+        self.createNodeItems(nodes)
+
+    def createNodeItems(self, nodes):
+        """
+        :return: the items of the nodes, nodes loaded headless get theirs now
+        """
+        items = []
+        newItems = {}
+        for node in nodes:
+            item = node.nodeObject.item
+            if not isinstance(item, NodeItem):
+                item = self._createNodeItem(node)
+                newItems[node] = item
+            items.append(item)
+        if len(newItems) > 0:
+            self._nodesIndex.replace(newItems)
+        return items
+
+    def createNodeItem(self, node):
+        return self.createNodeItems([node])[0]
+
+    def _createNodeItem(self, node):
+        nodeItem = NodeItem.createItem(node.Class(), nodeModel=node)
+        self.addItem(nodeItem)
+        if self.lowDetail:
+            nodeItem.setPortsVisible(False)
+        nodeItem.afterAddToScene()
+        pos = node.scenePos()
+        nodeItem.setX(pos.x())
+        nodeItem.setY(pos.y())
+        self._nodesGrid.remove(node)
+
+        # connections move to the ports of the item, the ones with an item at the other end become pipes.
+        # the others stay out of the pipes of the port until then, only its connections know them
+        for port in node.ports:
+            if port.io == 0:
+                itemPort = nodeItem.getInputPort(port.name)
+            else:
+                itemPort = nodeItem.getOutputPort(port.name)
+            for edge in port.pipes:
+                if edge.source is port:
+                    edge.source = itemPort
+                else:
+                    edge.target = itemPort
+                itemPort.connections.append(edge)
+                if isinstance(edge.source, Port) and isinstance(edge.target, Port):
+                    self._createPipe(edge)
+        return nodeItem
+
+    def _createPipe(self, edge):
+        source = edge.source
+        target = edge.target
+        pipe = target.createPipe()
+        pipe.source = source
+        pipe.target = target
+        # same place in the connections, the order they are saved and executed in
+        for port in [source, target]:
+            port.connections[port.connections.index(edge)] = pipe
+            port.pipes.append(pipe)
+        self.addItem(pipe)
+        pipe.updatePath()
+        self._edgesGrid.remove(edge)
+
+    def removeEdge(self, edge):
+        """
+        break a connection to a node without item, the counterpart of removeItem for a pipe
+        """
+        edge.breakConnection()
+        self._edgesGrid.remove(edge)
+
+    def getConnectNode(self, nodeName):
+        node = self.getNode(nodeName)
+        if node is None:
+            return None
+        return self.createNodeItem(node)
 
     def _loadSceneFromXml(self, xmlString):
         self.pasteNodesFromXml(xmlString, selected=False)
 
     def setFile(self, path, reset=True):
         self.path = path
-        self._loadSceneFromUng(path)
+        if reset:
+            self.resetScene()
 
     @log_cost_time
     def resetScene(self, xmlString=''):
@@ -549,15 +892,20 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
         self._afterResetScene()
 
     def _beforeResetScene(self):
+        if self.view is not None:
+            self.view.clearLabelNodes()
         self.clear()
-        self._allNodes = {}
+        self._nodesIndex.clear()
         self._nodesSuffix = {}
+        self._nodesGrid.clear()
+        self._edgesGrid.clear()
+        self._itemCells = set()
 
     def _afterResetScene(self):
         self.view._resizeScene()
         self.frameSelection()
 
-        logger.debug('scene nodeItem number: {}'.format(len(self.allNodes())))
+        logger.debug('scene nodeItem number: {}'.format(len(self._nodesIndex)))
 
     def createNode(self, nodeClass, name=None, pos=None, **kwargs):
         # QCoreApplication.processEvents()
@@ -566,6 +914,7 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
             if name is None:
                 name = nodeClass
             nodeName, suffix, index = self._getUniqueName(name)
+            self.invalidateExecutionPlan()
             nodeItem = NodeItem.createItem(
                 nodeClass,
                 name=nodeName,
@@ -573,8 +922,10 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
             )
 
             self.addItem(nodeItem)
+            if self.lowDetail:
+                nodeItem.setPortsVisible(False)
             nodeItem.afterAddToScene()
-            self._allNodes.update({nodeItem: nodeName})
+            self._nodesIndex.add(nodeItem, nodeName)
 
             if pos is None:
                 center = self.view.getCenterPos()
@@ -593,7 +944,7 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
         self._addChildNode(node, parentNode)
 
     def selectAll(self):
-        for node in self.allNodes():
+        for node in self.createNodeItems(self.allNodes()):
             node.setSelected(True)
 
     def deleteSelection(self):
@@ -615,15 +966,20 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
             self.deleteNode(node)
 
     def deleteNode(self, node):
-        pipes = []
+        self.invalidateExecutionPlan()
+        pipes = set()
         for port in node.ports:
-            for pipe in port.pipes:
-                if pipe not in pipes:
-                    pipes.append(pipe)
+            pipes.update(port.connections if isinstance(node, NodeItem) else port.pipes)
         for pipe in pipes:
-            pipe.breakConnection()
-        self.removeItem(node)
-        self._allNodes.pop(node)
+            if isinstance(pipe, Pipe):
+                pipe.breakConnection()
+            else:
+                self.removeEdge(pipe)
+        if isinstance(node, NodeItem):
+            self.removeItem(node)
+        else:
+            self._nodesGrid.remove(node)
+        self._nodesIndex.remove(node)
         self.nodeDeleted.emit(node)
 
     def frameSelection(self):
@@ -640,60 +996,99 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
                 return
 
     def updateSelectedNodesPipe(self):
-        pipes = []
+        # a pipe between two selected nodes is updated once
+        pipes = set()
         for node in self.getSelectedNodes():
             for port in node.ports:
-                for pipe in port.pipes:
-                    if pipe not in pipes:
-                        pipes.append(pipe)
+                pipes.update(port.pipes)
         for pipe in pipes:
             pipe.updatePath()
 
     def allNodes(self):
-        return list(self._allNodes.keys())
+        return list(self._nodesIndex.nodes())
+
+    def iterNodes(self):
+        return iter(self._nodesIndex.nodes())
+
+    def hasNode(self, nodeName):
+        return nodeName in self._nodesIndex
 
     def getNode(self, nodeName):
-        nodes = self.allNodes()
-        for node in nodes:
-            if node.name() == nodeName:
-                return node
+        return self._nodesIndex.get(nodeName)
+
+    def getNodesByType(self, nodeType):
+        return self._nodesIndex.getByType(nodeType)
+
+    def getNodesByGroup(self, nodeGroup):
+        return self._nodesIndex.getByGroup(nodeGroup)
 
     def getNodes(self, type=None):
-        nodes = self.allNodes()
         if type is None:
-            return nodes
+            return self.allNodes()
         if not isinstance(type, (list, tuple)):
             type = [type]
-        nodes = [n for n in nodes if n.nodeType in type]
+        nodes = []
+        for t in type:
+            nodes.extend(self._nodesIndex.getByType(t))
         return nodes
 
     def getSelectedNodes(self):
         return [n for n in self.selectedItems() if isinstance(n, NodeItem)]
 
-    def getNodesAsXml(self, nodes):
-        rootElement = ET.Element('pynodegraph')
-        nodesDict = {}
-        if len(nodes) > 0:
-            firstNode = nodes[0]
-            minX = firstNode.parameter('x').getValue()
-            minY = firstNode.parameter('y').getValue()
-            for node in nodes:
-                nodeElement = node.toXmlElement()
-                rootElement.append(nodeElement)
+    def _writeNodesXml(self, nodes, writer):
+        firstNode = nodes[0]
+        minX = firstNode.parameter('x').getValue()
+        minY = firstNode.parameter('y').getValue()
+        for node in nodes:
+            minX = min(node.parameter('x').getValue(), minX)
+            minY = min(node.parameter('y').getValue(), minY)
 
-                minX = min(node.parameter('x').getValue(), minX)
-                minY = min(node.parameter('y').getValue(), minY)
+        xmlWriter = XmlWriter(writer)
+        xmlWriter.writeHeader()
+        xmlWriter.startElement('pynodegraph', {'x': str(minX), 'y': str(minY)})
+        for node in nodes:
+            xmlWriter.writeElement(node.toXmlElement())
+        xmlWriter.endElement('pynodegraph')
 
-            rootElement.set('x', str(minX))
-            rootElement.set('y', str(minY))
-            nodesString = convertToString(rootElement)
-            return nodesString
+    def getNodesAsXml(self, nodes):
+        if len(nodes) > 0:
+            buffer = io.StringIO()
+            self._writeNodesXml(nodes, buffer)
+            return buffer.getvalue()
         return ''
 
+    def _writeNodesBinary(self, nodes, f):
+        rootElement = ET.Element('pynodegraph', {'x': 0.0, 'y': 0.0})
+        if len(nodes) > 0:
+            rootElement.set('x', min(node.parameter('x').getValue() for node in nodes))
+            rootElement.set('y', min(node.parameter('y').getValue() for node in nodes))
+        for node in nodes:
+            rootElement.append(node.toXmlElement(typed=True))
+        writeBinary(rootElement, f)
+
     def _exportNodesToFile(self, nodes, xmlfile):
-        nodesString = self.getNodesAsXml(nodes)
-        with open(xmlfile, 'w') as f:
-            f.write(nodesString)
+        # write next to the file and replace it at the end, a failed save keeps the old file
+        fd, tempPath = tempfile.mkstemp(prefix='.{}.'.format(os.path.basename(xmlfile)), suffix='.tmp',
+                                        dir=os.path.dirname(os.path.abspath(xmlfile)))
+        try:
+            if xmlfile.endswith(BINARY_EXTENSION):
+                with os.fdopen(fd, 'wb') as f:
+                    self._writeNodesBinary(nodes, f)
+            else:
+                with os.fdopen(fd, 'w') as f:
+                    if len(nodes) > 0:
+                        self._writeNodesXml(nodes, f)
+
+            if os.path.exists(xmlfile):
+                shutil.copymode(xmlfile, tempPath)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tempPath, 0o666 & ~umask)
+            os.replace(tempPath, xmlfile)
+        except BaseException:
+            os.remove(tempPath)
+            raise
 
     def getSelectedNodesAsXml(self):
         nodes = self.getSelectedNodes()
@@ -711,127 +1106,26 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
         nodes = self.getSelectedNodes()
         self._exportNodesToFile(nodes, xmlfile)
 
-    def createParamFromXml(self, paramElement, node, offsetX=0, offsetY=0):
-        paramName = paramElement.get('n')
-        if paramName in ['name']:
-            return
-
-        custom = paramElement.get('cus', '0')
-        visible = paramElement.get('vis', '1')
-        parameterType = paramElement.get('t')
-        value = paramElement.get('val')
-        connect = paramElement.get('con')
-        metadatas = paramElement.findall('m')
-        hints = paramElement.findall('h')
-
-        if node.hasParameter(paramName):
-            parameter = node.parameter(paramName)
-        else:
-            parameter = node.addParameter(paramName, parameterType, custom=custom)
-
-        if connect is not None:
-            parameter.setConnect(connect)
-
-        value = parameter.convertValueFromPy(value)
-        if paramName == 'x':
-            value = offsetX + value
-            node.nodeObject.setProperty('x', value)
-        elif paramName == 'y':
-            value = offsetY + value
-            node.nodeObject.setProperty('y', value)
-        elif node.nodeObject.hasProperty(paramName):
-            node.nodeObject.setProperty(paramName, value)
-        elif paramName == 'label':
-            value = value.replace('<\\n>', '\n')
-
-        parameter.setValueQuietly(value)
-
-        for metadataElement in metadatas:
-            self.createMetadataFromXml(metadataElement, parameter)
-        for hintElement in hints:
-            self.createHintFromXml(hintElement, parameter)
-
-    def createMetadataFromXml(self, metadataElement, obj):
-        key = metadataElement.get('k')
-        value = metadataElement.get('v')
-        obj.setMetadata(key, value)
-
-    def createHintFromXml(self, hintElement, obj):
-        key = hintElement.get('k')
-        value = hintElement.get('v')
-        obj.setHint(key, value)
-
-    def createNodeFromXml(self, nodeElement, _newNodes, _nameConvertDict, offsetX=0, offsetY=0):
-        oldNodeName = nodeElement.get('n')
-        nodeClass = nodeElement.get('c')
-        node = self.createNode(nodeClass, name=oldNodeName)
-        newName = node.parameter('name').getValue()
-
-        _newNodes.append(node)
-        _nameConvertDict.update({oldNodeName: newName})
-
-        for paramElement in nodeElement.findall('p'):
-            self.createParamFromXml(paramElement, node, offsetX, offsetY)
-
-        for metadataElement in nodeElement.findall('m'):
-            self.createMetadataFromXml(metadataElement, node)
-
-        node.afterAddToScene()
-
-    def createConnectFromXml(self, nodeElement, _nameConvertDict):
-        oldNodeName = nodeElement.get('n')
-
-        newNode = self.getNode(_nameConvertDict.get(oldNodeName))
-        if newNode is None:
-            return
+    def getXmlRootOffset(self, rootElement):
+        # empty .pyngb files written before the offsets were always set have none
+        _topLeftX = float(rootElement.get('x', 0))
+        _topLeftY = float(rootElement.get('y', 0))
 
-        for outputElement in nodeElement.findall('o'):
-            outputName = outputElement.get('n')
-            sourceNodeName = outputElement.get('conN')
-            sourceNodeInputName = outputElement.get('conP')
-
-            sourceNode = self.getNode(_nameConvertDict.get(sourceNodeName))
-            if sourceNode is None:
-                sourceNode = self.getNode(sourceNodeName)
-                if sourceNode is None:
-                    continue
-            sourceNode.connectSource(newNode, inputName=sourceNodeInputName, outputName=outputName)
-
-        for inputElement in nodeElement.findall('i'):
-            inputName = inputElement.get('n')
-            sourceNodeName = inputElement.get('conN')
-            sourceNodeOutputName = inputElement.get('conP')
-
-            sourceNode = self.getNode(_nameConvertDict.get(sourceNodeName))
-            if sourceNode is None:
-                sourceNode = self.getNode(sourceNodeName)
-                if sourceNode is None:
-                    continue
-            newNode.connectSource(sourceNode, inputName=inputName, outputName=sourceNodeOutputName)
-
-    def createNodesFromXml(self, rootElement, offsetX=0, offsetY=0):
-        _nameConvertDict = {}
-        _newNodes = []
-        for nodeElement in rootElement.getchildren():
-            self.createNodeFromXml(
-                nodeElement, _newNodes, _nameConvertDict,
-                offsetX, offsetY
-            )
-
-        # connections
-        for nodeElement in rootElement.getchildren():
-            self.createConnectFromXml(nodeElement, _nameConvertDict)
+        scenePos = self.view.mapToScene(self.view.clickedPos)
+        offsetX = scenePos.x() - _topLeftX
+        offsetY = scenePos.y() - _topLeftY
+        return offsetX, offsetY
 
-        return _newNodes
+    def pasteNodesFromFile(self, path, selected=True):
+        nodes = self.createNodesFromFile(path)
+        if selected:
+            for node in nodes:
+                node.setSelected(True)
+        return nodes
 
     def pasteNodesFromXml(self, nodesString, selected=True):
         rootElement = ET.fromstring(nodesString)
-        _topLeftX = float(rootElement.get('x'))
-        _topLeftY = float(rootElement.get('y'))
-
-        scenePos = self.view.mapToScene(self.view.clickedPos)
-        offsetX = scenePos.x() - _topLeftX
-        offsetY = scenePos.y() - _topLeftY
+        offsetX, offsetY = self.getXmlRootOffset(rootElement)
 
         nodes = self.createNodesFromXml(rootElement, offsetX, offsetY)
         if selected:
@@ -842,22 +1136,25 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
 
     def saveNodes(self):
         if self.path is None:
-            xmlFile = QtWidgets.QFileDialog.getSaveFileName(None, 'Save', filter='PY Node Graph(*.pyng *.xml)')
+            xmlFile = QtWidgets.QFileDialog.getSaveFileName(None, 'Save', filter='PY Node Graph(*.pyng *.pyngb *.xml)')
             if isinstance(xmlFile, tuple):
                 xmlFile = xmlFile[0]
             xmlFile = str(xmlFile)
             if xmlFile == '':
                 return
-            if not (xmlFile.endswith('.pyng') or xmlFile.endswith('.xml')):
+            if not (xmlFile.endswith('.pyng') or xmlFile.endswith(BINARY_EXTENSION) or xmlFile.endswith('.xml')):
                 xmlFile += '.pyng'
             self.path = xmlFile
         self.exportAllNodesToFile(self.path)
 
     def execute(self):
         print('Execute nodes.')
-        mainNode = self.getRootNode()
+        mainNode = self.getExecutionPlan().getRootNode()
         if mainNode is None:
             return
-        mainNode = mainNode.nodeObject
-        mainNode.execute()
+        GraphState.beginExecutionBatch()
+        try:
+            mainNode.execute()
+        finally:
+            GraphState.endExecutionBatch()
 
@@ -5,6 +5,7 @@ from pyNodeGraph.module.sqt import *
 from pyNodeGraph.ui.graph.view import GraphicsSceneWidget
 from pyNodeGraph.ui.parameter.param_panel import ParameterPanel
 from pyNodeGraph.core.state.core import GraphState
+from pyNodeGraph.core.parse.binary import BINARY_EXTENSION
 from pyNodeGraph.core.node.node import Node
 from pyNodeGraph.utils.settings import User_Setting, read_setting, write_setting
 from pyNodeGraph.utils.res import resource
@@ -274,7 +275,7 @@ class PyNodeGraph(QtWidgets.QMainWindow, WithMenuObject):
         self._addNewScene()
 
     def _openActionTriggered(self):
-        file = QtWidgets.QFileDialog.getOpenFileName(None, 'Select File', filter='PY Node Graph(*.pyng *.xml)')
+        file = QtWidgets.QFileDialog.getOpenFileName(None, 'Select File', filter='PY Node Graph(*.pyng *.pyngb *.xml)')
         if isinstance(file, tuple):
             file = file[0]
         file = str(file)
@@ -283,23 +284,21 @@ class PyNodeGraph(QtWidgets.QMainWindow, WithMenuObject):
             self._addFile(file)
 
     def _importNodesActionTriggered(self):
-        xmlFile = QtWidgets.QFileDialog.getOpenFileName(None, 'Import File', filter='PY Node Graph(*.pyng *.xml)')
+        xmlFile = QtWidgets.QFileDialog.getOpenFileName(None, 'Import File', filter='PY Node Graph(*.pyng *.pyngb *.xml)')
         if isinstance(xmlFile, tuple):
             xmlFile = xmlFile[0]
         xmlFile = str(xmlFile)
         if os.path.exists(xmlFile):
-            with open(xmlFile, 'r') as f:
-                nodesString = f.read()
-            nodes = self.currentScene.scene.pasteNodesFromXml(nodesString)
+            nodes = self.currentScene.scene.pasteNodesFromFile(xmlFile)
 
     def _exportNodesActionTriggered(self):
-        xmlFile = QtWidgets.QFileDialog.getSaveFileName(None, 'Export', filter='PY Node Graph(*.pyng *.xml)')
+        xmlFile = QtWidgets.QFileDialog.getSaveFileName(None, 'Export', filter='PY Node Graph(*.pyng *.pyngb *.xml)')
         if isinstance(xmlFile, tuple):
             xmlFile = xmlFile[0]
         xmlFile = str(xmlFile)
         if xmlFile == '':
             return
-        if not xmlFile.endswith('.pyng'):
+        if not (xmlFile.endswith('.pyng') or xmlFile.endswith(BINARY_EXTENSION)):
             xmlFile += '.pyng'
         self.currentScene.scene.exportSelectedNodesToFile(xmlFile)
 
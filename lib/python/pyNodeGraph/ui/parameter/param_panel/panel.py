@@ -15,6 +15,7 @@ class ParamStatusButton(QtWidgets.QLabel):
         super(ParamStatusButton, self).__init__()
 
         self._parameter = None
+        self._override = None
         size = 18
 
         self.defaultPixmap = resource.get_pixmap('btn', 'radio_unchecked.png', scale=size)
@@ -26,10 +27,16 @@ class ParamStatusButton(QtWidgets.QLabel):
         # self.buttonClicked.connect(self._selfClicked)
 
     def setParameter(self, parameter):
+        self.clearParameter()
         self._parameter = parameter
         self._parameter.valueChanged.connect(self._valueChanged)
         self._updateColor()
 
+    def clearParameter(self):
+        if self._parameter is not None:
+            self._parameter.valueChanged.disconnect(self._valueChanged)
+            self._parameter = None
+
     def _selfClicked(self):
         self._parameter.setOverride(not self._parameter.isOverride())
 
@@ -38,6 +45,9 @@ class ParamStatusButton(QtWidgets.QLabel):
 
     def _updateColor(self):
         override = self._parameter.isOverride()
+        if override == self._override:
+            return
+        self._override = override
         if override:
             self.setPixmap(self.overridePixmap)
         else:
@@ -69,6 +79,22 @@ class ParamHelpLabel(QtWidgets.QLabel):
 class ParamLabelWidget(QtWidgets.QWidget):
     paramLabelClicked = QtCore.Signal(object)
 
+    _widgetPool = []
+    _widgetPoolSize = 200
+
+    @classmethod
+    def createLabelWidget(cls, parameter):
+        labelWidget = cls._widgetPool.pop() if cls._widgetPool else cls()
+        labelWidget.setParameter(parameter)
+        return labelWidget
+
+    @classmethod
+    def releaseLabelWidget(cls, labelWidget):
+        labelWidget.clearParameter()
+        if len(cls._widgetPool) < cls._widgetPoolSize:
+            labelWidget.setParent(None)
+            cls._widgetPool.append(labelWidget)
+
     def __init__(self):
         super(ParamLabelWidget, self).__init__()
 
@@ -94,6 +120,10 @@ class ParamLabelWidget(QtWidgets.QWidget):
         self.helpLabel.setParameter(parameter)
         self.updateUI()
 
+    def clearParameter(self):
+        self.statusLabel.clearParameter()
+        self._parameter = None
+
     def updateUI(self):
         self.nameLabel.setText(self._parameter.getLabel())
         tooltip = '{} {}'.format(self._parameter.parameterTypeString, self._parameter.name())
@@ -127,12 +157,16 @@ class ParamLabelWidget(QtWidgets.QWidget):
 
 
 class PageWidget(QtWidgets.QWidget):
+    pageExpanded = QtCore.Signal(object)
+
     def __init__(self, page):
         super(PageWidget, self).__init__()
 
         self._expand = 1
         self._page = page
         self._subPages = {}
+        # names of the parameters to build when the page is first expanded
+        self._pendingParameters = []
 
         self.expandIcon = resource.get_qicon('btn', 'arrow1_down.png')
         self.unexpandIcon = resource.get_qicon('btn', 'arrow1_right.png')
@@ -175,13 +209,27 @@ class PageWidget(QtWidgets.QWidget):
     def findPage(self, subpage):
         if subpage not in self._subPages:
             pageWidget = PageWidget(subpage)
+            pageWidget.pageExpanded.connect(self.pageExpanded)
             self.addPage(pageWidget)
         return self._subPages[subpage]
 
+    def isExpanded(self):
+        return bool(self._expand)
+
+    def addPendingParameter(self, parameterName):
+        self._pendingParameters.append(parameterName)
+
+    def takePendingParameters(self):
+        parameters = self._pendingParameters
+        self._pendingParameters = []
+        return parameters
+
     def _expandClicked(self):
         self._expand = 1 - self._expand
         self.downWidget.setVisible(self._expand)
         self.expandButton.setIcon(self.expandIcon if self._expand else self.unexpandIcon)
+        if self._expand:
+            self.pageExpanded.emit(self)
 
 
 class NodeParameterWidget(QtWidgets.QFrame):
@@ -192,6 +240,8 @@ class NodeParameterWidget(QtWidgets.QFrame):
 
         self._nodeItem = None
         self._tabs = {}
+        # parameter names of the tabs not shown yet
+        self._tabParameters = {}
         self._paramWidgets = {}
         self._paramLabelWidgets = {}
         self._pageWidgets = {}
@@ -204,6 +254,7 @@ class NodeParameterWidget(QtWidgets.QFrame):
     def _createSignal(self):
         self.expandButton.clicked.connect(self._expandClicked)
         self.closeButton.clicked.connect(self._closeClicked)
+        self.parameterTabWidget.currentChanged.connect(self._tabChanged)
 
     def _initUI(self):
         self.setObjectName('NodeParameterWidget')
@@ -293,7 +344,48 @@ class NodeParameterWidget(QtWidgets.QFrame):
 
         self._backLabel.resize(self.width(), 30)
 
+    def _getLayoutKey(self, node):
+        return [
+            (param.name(), param.getParameterWidgetClass(),
+             param.getHintValue('tab', tryEval=False), param.getHintValue('page', tryEval=False))
+            for param in node.parameters() if param.isVisible()
+        ]
+
+    def _clearNode(self, rebuild):
+        nodeObject = self._nodeItem.nodeObject
+        nodeObject.parameterAdded.disconnect(self._nodeParameterAdded)
+        nodeObject.parameterRemoved.disconnect(self._nodeParameterRemoved)
+        nodeObject.parameterPagesCleared.disconnect(self._nodeParameterPagesCleared)
+        self._nodeItem.panel = None
+        self.metadataWidget.setVisible(False)
+
+        self.removeParameterConnections()
+        if rebuild:
+            self.releaseWidgets()
+            self.parameterTabWidget.clear()
+            for tab in self._tabs.values():
+                tab.deleteLater()
+            self._tabs = {}
+            self._tabParameters = {}
+            self._pageWidgets = {}
+
+    def _rebindParameters(self):
+        for name, widget in self._paramWidgets.items():
+            if not self._isTopWidget(widget):
+                widget.setParameter(self._nodeItem.parameter(name))
+        for name, labelWidget in self._paramLabelWidgets.items():
+            labelWidget.setParameter(self._nodeItem.parameter(name))
+
     def setNode(self, node):
+        """
+        a widget showing another node is reused: if both nodes have the same visible parameters,
+        the built widgets are given the parameters of the new node, else the tabs are built again.
+        """
+        rebind = False
+        if self._nodeItem is not None:
+            rebind = self._getLayoutKey(self._nodeItem) == self._getLayoutKey(node)
+            self._clearNode(rebuild=not rebind)
+
         self._nodeItem = node
         self._nodeItem.panel = self
         self._nodeItem.nodeObject.parameterAdded.connect(self._nodeParameterAdded)
@@ -308,14 +400,20 @@ class NodeParameterWidget(QtWidgets.QFrame):
         self._paramWidgets.update({'fillColor': self.fillColorEdit})
         self._paramWidgets.update({'borderColor': self.borderColorEdit})
 
-        self._buildUI()
-        self.updateUI()
+        if rebind:
+            self._rebindParameters()
+            self.updateUI()
+        else:
+            # the shown tab updates its own widgets when it is built
+            self._buildUI()
+            self._updateTopUI()
 
     def getNode(self):
         return self._nodeItem
 
     def createPageWidget(self, page, parentLayout):
         pageWidget = PageWidget(page)
+        pageWidget.pageExpanded.connect(self._pageExpanded)
         parentLayout.pagesLayout.addWidget(pageWidget)
         return pageWidget
 
@@ -326,38 +424,80 @@ class NodeParameterWidget(QtWidgets.QFrame):
 
         return self._pageWidgets[mainPage]
 
-    def findPageLayout(self, page, parentLayout):
+    def findPage(self, page, parentLayout):
         pages = page.split('.')
         mainPage = pages[0]
         currentWidget = self.findPageWidget(mainPage, parentLayout)
         for i in pages[1:]:
             currentWidget = currentWidget.findPage(i)
-        layout = currentWidget.masterLayout
-        return layout
+        return currentWidget
+
+    def findPageLayout(self, page, parentLayout):
+        return self.findPage(page, parentLayout).masterLayout
 
     def createParameterWidget(self, parameter, layout):
+        """
+        :return: the parameter widget, None if it is not visible or waits in a collapsed page
+        """
         if not parameter.isVisible():
             return
-        parameterLabel = ParamLabelWidget()
-        parameterLabel.setParameter(parameter)
-        parameterLabel.paramLabelClicked.connect(self._paramLabelClicked)
+
+        page = parameter.getHintValue('page', '')
+        if page != '':
+            pageWidget = self.findPage(page, layout)
+            if not pageWidget.isExpanded():
+                pageWidget.addPendingParameter(parameter.name())
+                return
+            layout = pageWidget.masterLayout
+
         parameterWidget = ParameterWidget.createParameterWidget(parameter)
         if parameterWidget is None:
             return
+        parameterLabel = ParamLabelWidget.createLabelWidget(parameter)
+        parameterLabel.paramLabelClicked.connect(self._paramLabelClicked)
 
         self._paramWidgets.update({parameter.name(): parameterWidget})
         self._paramLabelWidgets.update({parameter.name(): parameterLabel})
 
-        page = parameter.getHintValue('page', '')
-        if page != '':
-            layout = self.findPageLayout(page, layout)
-
         layout.formLayout.addRow(parameterLabel, parameterWidget)
+        parameterLabel.show()
+        parameterWidget.show()
+        return parameterWidget
+
+    def _createParameterWidgets(self, parameterNames, layout):
+        for name in parameterNames:
+            parameter = self._nodeItem.parameter(name)
+            if parameter is None:
+                continue
+            parameterWidget = self.createParameterWidget(parameter, layout)
+            if parameterWidget is not None:
+                parameterWidget.updateUI()
+
+    def _pageExpanded(self, pageWidget):
+        self._createParameterWidgets(pageWidget.takePendingParameters(), pageWidget.masterLayout)
+
+    def _isTopWidget(self, widget):
+        return widget in (self.nodeNameEdit, self.fillColorEdit, self.borderColorEdit)
 
     def removeParameterConnections(self):
-        for paramName, widget in self._paramWidgets.items():
-            param = self._nodeItem.parameter(paramName)
-            param.removeParamWidget(widget)
+        for widget in self._paramWidgets.values():
+            widget.clearParameter()
+        for labelWidget in self._paramLabelWidgets.values():
+            labelWidget.clearParameter()
+
+    def releaseWidgets(self):
+        """
+        give the parameter widgets back to the pools before this widget is deleted
+        """
+        self.removeParameterConnections()
+        for widget in self._paramWidgets.values():
+            if not self._isTopWidget(widget):
+                ParameterWidget.releaseParameterWidget(widget)
+        for labelWidget in self._paramLabelWidgets.values():
+            labelWidget.paramLabelClicked.disconnect(self._paramLabelClicked)
+            ParamLabelWidget.releaseLabelWidget(labelWidget)
+        self._paramWidgets = {}
+        self._paramLabelWidgets = {}
 
     def _buildTab(self, label, parameters=[]):
         layout = QtWidgets.QVBoxLayout()
@@ -372,12 +512,17 @@ class NodeParameterWidget(QtWidgets.QFrame):
         tab = QtWidgets.QWidget()
         tab.setLayout(layout)
         self._tabs.update({label: tab})
+        self._tabParameters.update({label: [param.name() for param in parameters]})
 
-        for parameter in parameters:
-            self.createParameterWidget(parameter, layout)
-
+        # widgets are built by _tabChanged when the tab is first shown
         self.parameterTabWidget.addTab(tab, label)
 
+    def _tabChanged(self, index):
+        label = self.parameterTabWidget.tabText(index)
+        parameters = self._tabParameters.pop(label, None)
+        if parameters is not None:
+            self._createParameterWidgets(parameters, self._tabs[label].layout())
+
     def _buildUI(self):
         parameters = self._nodeItem.parameters()
         noTabParams = [param for param in parameters if not param.hasHint('tab')]
@@ -386,6 +531,11 @@ class NodeParameterWidget(QtWidgets.QFrame):
         self._buildTab(self._nodeItem.nodeType, noTabParams)
         self._buildTab('Node', nodeTabParams)
 
+    def _updateTopUI(self):
+        self.nodeTypeLabel.setText(self._nodeItem.nodeType)
+        for paramWidget in (self.nodeNameEdit, self.fillColorEdit, self.borderColorEdit):
+            paramWidget.updateUI()
+
     def updateUI(self):
         self.nodeTypeLabel.setText(self._nodeItem.nodeType)
 
@@ -397,14 +547,25 @@ class NodeParameterWidget(QtWidgets.QFrame):
                 paramWidget.updateUI()
 
     def _nodeParameterAdded(self, parameter):
-        tab = self._tabs[self._nodeItem.nodeType]
+        nodeType = self._nodeItem.nodeType
+        if nodeType in self._tabParameters:
+            self._tabParameters[nodeType].append(parameter.name())
+            return
+        tab = self._tabs[nodeType]
         layout = tab.layout()
         self.createParameterWidget(parameter, layout)
 
+    def _removeParameterWidget(self, parameterName):
+        parameterWidget = self._paramWidgets.pop(parameterName)
+        parameterWidget.clearParameter()
+        labelWidget = self._paramLabelWidgets.pop(parameterName, None)
+        if labelWidget is not None:
+            labelWidget.clearParameter()
+        return parameterWidget
+
     def _nodeParameterRemoved(self, parameterName):
         if parameterName in self._paramWidgets:
-            parameterWidget = self._paramWidgets[parameterName]
-            self._paramWidgets.pop(parameterName)
+            parameterWidget = self._removeParameterWidget(parameterName)
             layout = parameterWidget.parentLayout
             layout.removeRowWidget(parameterWidget)
 
@@ -412,6 +573,12 @@ class NodeParameterWidget(QtWidgets.QFrame):
         tab = self._tabs[self._nodeItem.nodeType]
         layout = tab.layout()
         pagesLayout = layout.pagesLayout
+        # widgets in the pages are deleted with them
+        for name, widget in list(self._paramWidgets.items()):
+            for pageWidget in self._pageWidgets.values():
+                if pageWidget.isAncestorOf(widget):
+                    self._removeParameterWidget(name)
+                    break
         clearLayout(pagesLayout)
         self._pageWidgets = {}
 
@@ -519,7 +686,7 @@ class ParameterPanel(QtWidgets.QWidget):
         self._removeExtraWidgets()
 
     def _removeExtraWidgets(self):
-        num = int(self.widgetNumEdit.text())
+        num = self._getWidgetNum()
         indexs = list(range(len(self._widgets)))
         indexs.sort(reverse=True)
         for i in indexs:
@@ -532,7 +699,7 @@ class ParameterPanel(QtWidgets.QWidget):
         self._removeWidget(widget)
 
     def _removeWidget(self, nodeWidget):
-        nodeWidget.removeParameterConnections()
+        nodeWidget.releaseWidgets()
         self._widgets.remove(nodeWidget)
         self._nodes.remove(nodeWidget.getNode())
         nodeWidget.deleteLater()
@@ -547,14 +714,37 @@ class ParameterPanel(QtWidgets.QWidget):
         for node in nodes:
             self.removeNode(node)
 
+    def _getWidgetNum(self):
+        try:
+            return int(self.widgetNumEdit.text())
+        except ValueError:
+            return 10
+
     def addNode(self, node):
+        if node in self._nodes:
+            # already in the panel, move it to the top
+            nodeParameterWidget = self._widgets[self._nodes.index(node)]
+            self._widgets.remove(nodeParameterWidget)
+            self._nodes.remove(node)
+            self._widgets.insert(0, nodeParameterWidget)
+            self._nodes.insert(0, node)
+            self.widgetsAreaLayout.insertWidget(0, nodeParameterWidget)
+            nodeParameterWidget.updateUI()
+            return
+
         if node.name() in [n.name() for n in self._nodes]:
             self.removeNode(node.name())
 
-        nodeParameterWidget = NodeParameterWidget()
-        nodeParameterWidget.setNode(node)
+        if 0 < self._getWidgetNum() <= len(self._widgets):
+            # the panel is full, reuse the widget of the oldest node
+            nodeParameterWidget = self._widgets.pop()
+            self._nodes.pop()
+            nodeParameterWidget.setNode(node)
+        else:
+            nodeParameterWidget = NodeParameterWidget()
+            nodeParameterWidget.setNode(node)
 
-        nodeParameterWidget.removeClicked.connect(self._removeRequired)
+            nodeParameterWidget.removeClicked.connect(self._removeRequired)
 
         self._widgets.insert(0, nodeParameterWidget)
         self._nodes.insert(0, node)
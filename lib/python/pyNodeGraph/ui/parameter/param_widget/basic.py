@@ -2,12 +2,10 @@ from pyNodeGraph.module.sqt import *
 from pyNodeGraph.core.parameter import Parameter
 from pyNodeGraph.utils.res import resource
 from pyNodeGraph.core.state.core import GraphState
-from pyNodeGraph.ui.utils.layout import clearLayout
 from pyNodeGraph.utils.log import get_logger
 from pyNodeGraph.ui.utils.log import LogWindow
 from ..param_edit.number_edit import IntEditWidget, FloatEditWidget
 from pyNodeGraph.utils.res import resource
-from pyNodeGraph.ui.utils.layout import FormLayout
 
 logger = get_logger('pyNodeGraph.ParameterWidget')
 
@@ -16,6 +14,22 @@ class ParameterWidget(object):
     # parameterClass = None
     editValueChanged = QtCore.Signal()
 
+    # released widgets by widget class, reused by createParameterWidget
+    _widgetPool = {}
+    _widgetPoolSize = 50
+
+    # widgets whose parameter changed, refreshed together at most once per frame
+    _dirtyWidgets = set()
+    _refreshInterval = 16
+
+    @classmethod
+    def _refreshDirtyWidgets(cls):
+        widgets = ParameterWidget._dirtyWidgets
+        ParameterWidget._dirtyWidgets = set()
+        for widget in widgets:
+            if widget._parameter is not None:
+                widget.updateUI()
+
     @classmethod
     def createParameterWidget(cls, parameter):
         parameterWidgetClass = parameter.getParameterWidgetClass()
@@ -30,11 +44,27 @@ class ParameterWidget(object):
             logger.warning(message)
             return
 
-        parameterWidget = parameterWidgetClass()
+        pool = cls._widgetPool.get(parameterWidgetClass)
+        if pool:
+            parameterWidget = pool.pop()
+        else:
+            parameterWidget = parameterWidgetClass()
         parameterWidget.setParameter(parameter)
 
         return parameterWidget
 
+    @classmethod
+    def releaseParameterWidget(cls, parameterWidget):
+        """
+        detach the widget from its parameter and keep it for the next createParameterWidget of the same class.
+        widgets over the pool size stay with their parent and are deleted with it.
+        """
+        parameterWidget.clearParameter()
+        pool = cls._widgetPool.setdefault(parameterWidget.__class__, [])
+        if len(pool) < cls._widgetPoolSize:
+            parameterWidget.setParent(None)
+            pool.append(parameterWidget)
+
     def __init__(self):
         super(ParameterWidget, self).__init__()
 
@@ -45,20 +75,21 @@ class ParameterWidget(object):
         self._connectEdit = None
 
         self._editSignalBreaked = False
-        self.editValueChanged.connect(self._editWidgetValueChanged)
+        self.editValueChanged.connect(self._editValueEmitted)
+
+    def _editValueEmitted(self):
+        # the edit signal is broken around every parameter setValue, a flag is cheaper than disconnecting
+        if not self._editSignalBreaked:
+            self._editWidgetValueChanged()
 
     def _editWidgetValueChanged(self):
         self._setValueFromEdit()
 
     def _breakEditSignal(self):
-        if not self._editSignalBreaked:
-            self._editSignalBreaked = True
-            self.editValueChanged.disconnect(self._editWidgetValueChanged)
+        self._editSignalBreaked = True
 
     def _reConnectEditSignal(self):
-        if self._editSignalBreaked:
-            self._editSignalBreaked = False
-            self.editValueChanged.connect(self._editWidgetValueChanged)
+        self._editSignalBreaked = False
 
     def _breakSignal(self):
         if not self._signalBreaked:
@@ -73,7 +104,12 @@ class ParameterWidget(object):
         # self._parameter._reConnectSignal()
 
     def _parameterValueChanged(self, parameter):
-        self.updateUI()
+        self.requestUpdateUI()
+
+    def requestUpdateUI(self):
+        if len(ParameterWidget._dirtyWidgets) == 0:
+            QtCore.QTimer.singleShot(self._refreshInterval, ParameterWidget._refreshDirtyWidgets)
+        ParameterWidget._dirtyWidgets.add(self)
 
     def _setValueFromEdit(self):
         value = self.getPyValue()
@@ -90,6 +126,13 @@ class ParameterWidget(object):
         if update:
             self.updateUI()
 
+    def clearParameter(self):
+        ParameterWidget._dirtyWidgets.discard(self)
+        if self._parameter is not None:
+            self._breakSignal()
+            self._parameter.removeParamWidget(self)
+            self._parameter = None
+
     def getParameter(self):
         return self._parameter
 
@@ -140,34 +183,215 @@ class ParameterWidget(object):
         self._reConnectSignal()
 
 
-class ArrayIndexLabel(QtWidgets.QLabel):
-    removeClicked = QtCore.Signal(int)
+class ArrayModel(QtCore.QAbstractTableModel):
+    """
+    table model over the array value of a parameter, one row per element, one column per vector component.
+    elements are converted one at a time with the child parameter class when shown or edited.
+    the list is edited in place, it is only copied once before the first edit so shared values are not changed.
+    """
+    valuesEdited = QtCore.Signal()
+
+    def __init__(self, childParamClass=Parameter, columns=1, convertText=str, parent=None):
+        super(ArrayModel, self).__init__(parent)
+
+        self.childParamClass = childParamClass
+        self.columns = columns
+        self.convertText = convertText
+        self._values = []
+        self._owned = True
+
+    def values(self):
+        return self._values
+
+    def setValues(self, values):
+        if values is self._values:
+            return
+        self.beginResetModel()
+        self._values = [] if values is None else values
+        self._owned = False
+        self.endResetModel()
+
+    def _ensureOwned(self):
+        if not self._owned:
+            self._values = list(self._values)
+            self._owned = True
+
+    def _getItem(self, row):
+        item = self.childParamClass.convertValueToPy(self._values[row])
+        if self.columns == 1:
+            return [item]
+        if not isinstance(item, (list, tuple)):
+            item = [item]
+        item = list(item[:self.columns])
+        return item + [self.convertText('')] * (self.columns - len(item))
+
+    def _makeItem(self, item):
+        return item[0] if self.columns == 1 else item
+
+    def _convertItem(self, item):
+        return self.childParamClass.convertValueFromPy(self._makeItem(item))
+
+    def defaultItem(self):
+        return [self.convertText('')] * self.columns
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._values)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.columns
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            value = self._getItem(index.row())[index.column()]
+            return value if role == QtCore.Qt.EditRole else str(value)
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Vertical:
+            return str(section)
+        return None
+
+    def flags(self, index):
+        return super(ArrayModel, self).flags(index) | QtCore.Qt.ItemIsEditable
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or role != QtCore.Qt.EditRole:
+            return False
+        self._ensureOwned()
+        row = index.row()
+        item = self._getItem(row)
+        item[index.column()] = value
+        self._values[row] = self._convertItem(item)
+        self.dataChanged.emit(index, index)
+        self.valuesEdited.emit()
+        return True
+
+    def insertItems(self, row, items):
+        """
+        :param items: elements as lists of column values
+        """
+        if len(items) == 0:
+            return
+        self._ensureOwned()
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + len(items) - 1)
+        self._values[row:row] = [self._convertItem(i) for i in items]
+        self.endInsertRows()
+        self.valuesEdited.emit()
+
+    def removeRowsList(self, rows):
+        rows = sorted(set(rows))
+        if len(rows) == 0:
+            return
+        self._ensureOwned()
+        # remove contiguous ranges from the end, indices before them stay valid
+        ranges = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        for first, last in reversed(ranges):
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            del self._values[first:last + 1]
+            self.endRemoveRows()
+        self.valuesEdited.emit()
+
+    def pasteText(self, row, text):
+        """
+        one element per line, vector components separated by tab, comma or space.
+        overwrite from row, append the lines past the end.
+        """
+        items = []
+        for line in text.splitlines():
+            if line.strip() == '':
+                continue
+            if self.columns == 1:
+                parts = [line.strip()]
+            else:
+                parts = line.replace(',', ' ').split()
+                parts = parts + [''] * (self.columns - len(parts))
+            items.append(self._convertItem([self.convertText(i) for i in parts[:self.columns]]))
+        if len(items) == 0:
+            return
+
+        self._ensureOwned()
+        row = min(max(row, 0), len(self._values))
+        replaced = items[:len(self._values) - row]
+        if len(replaced) > 0:
+            self._values[row:row + len(replaced)] = replaced
+            self.dataChanged.emit(
+                self.index(row, 0),
+                self.index(row + len(replaced) - 1, self.columns - 1)
+            )
+        appended = items[len(replaced):]
+        if len(appended) > 0:
+            start = len(self._values)
+            self.beginInsertRows(QtCore.QModelIndex(), start, start + len(appended) - 1)
+            self._values.extend(appended)
+            self.endInsertRows()
+        self.valuesEdited.emit()
+
+    def copyText(self, rows):
+        lines = []
+        for row in sorted(set(rows)):
+            lines.append('\t'.join([str(i) for i in self._getItem(row)]))
+        return '\n'.join(lines)
+
 
-    def __init__(self, index):
-        super(ArrayIndexLabel, self).__init__()
+class ArrayItemDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    editors are only created for the cell being edited
+    """
 
-        self.setAlignment(QtCore.Qt.AlignCenter)
-        self.setFixedWidth(20)
-        self.setIndex(index)
-        self.removePixmap = None
+    def __init__(self, lineEditClass, parent=None):
+        super(ArrayItemDelegate, self).__init__(parent)
+        self.lineEditClass = lineEditClass
 
-    def setIndex(self, index):
-        self.index = index
-        self.setText(str(index))
+    def createEditor(self, parent, option, index):
+        editor = self.lineEditClass()
+        editor.setParent(parent)
+        return editor
 
-    def enterEvent(self, QEvent):
-        super(ArrayIndexLabel, self).enterEvent(QEvent)
-        if self.removePixmap is None:
-            self.removePixmap = resource.get_pixmap('btn', 'close.png', scale=self.width())
-        self.setPixmap(self.removePixmap)
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(QtCore.Qt.EditRole))
 
-    def leaveEvent(self, QEvent):
-        super(ArrayIndexLabel, self).leaveEvent(QEvent)
-        self.setText(str(self.index))
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.getRealValue())
 
-    def mouseReleaseEvent(self, QMouseEvent):
-        super(ArrayIndexLabel, self).mouseReleaseEvent(QMouseEvent)
-        self.removeClicked.emit(self.index)
+
+class ArrayTableView(QtWidgets.QTableView):
+    def __init__(self):
+        super(ArrayTableView, self).__init__()
+
+        self.setSelectionBehavior(self.SelectRows)
+        self.setHorizontalScrollMode(self.ScrollPerPixel)
+        self.horizontalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        # fixed row height, the view never measures all the rows
+        self.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(20)
+
+    def selectedRows(self):
+        return set([index.row() for index in self.selectionModel().selectedIndexes()])
+
+    def keyPressEvent(self, event):
+        model = self.model()
+        if event.matches(QtGui.QKeySequence.Paste):
+            index = self.currentIndex()
+            row = index.row() if index.isValid() else model.rowCount()
+            model.pasteText(row, QtWidgets.QApplication.clipboard().text())
+        elif event.matches(QtGui.QKeySequence.Copy):
+            QtWidgets.QApplication.clipboard().setText(model.copyText(self.selectedRows()))
+        elif event.matches(QtGui.QKeySequence.Delete) and self.state() != self.EditingState:
+            model.removeRowsList(self.selectedRows())
+        else:
+            super(ArrayTableView, self).keyPressEvent(event)
 
 
 class ArrayParameterWidget(QtWidgets.QWidget, ParameterWidget):
@@ -189,27 +413,20 @@ class ArrayParameterWidget(QtWidgets.QWidget, ParameterWidget):
             QtWidgets.QSizePolicy.Fixed
         ))
 
-        self.scrollArea = QtWidgets.QScrollArea()
-        self.scrollArea.setWidgetResizable(True)
-        self.scrollArea.setMinimumHeight(100)
-        self.scrollArea.setVisible(0)
         self.areaWidget = None
-        self.areaLayout = None
-        self.formLayout = None
+        self.tableView = None
+        self.model = None
 
         self.masterLayout.addWidget(self.expandButton)
-        self.masterLayout.addWidget(self.scrollArea)
 
-        self.indexLabels = []
-        self.editWidgets = []
-        self.lineEdits = []
         self.expanded = 0
 
         self.expandButton.clicked.connect(self._expandClicked)
 
     def _setMasterWidgetEnable(self, enable):
         self.expandButton.setVisible(enable)
-        self.scrollArea.setVisible(enable)
+        if self.areaWidget is not None:
+            self.areaWidget.setVisible(enable and self.expanded)
 
     def _getEditWidgetClass(self):
         return None
@@ -217,95 +434,91 @@ class ArrayParameterWidget(QtWidgets.QWidget, ParameterWidget):
     def _getChildParamterClass(self):
         return None
 
+    def setParameter(self, parameter, update=False):
+        if self.model is not None:
+            # reused from the widget pool
+            self.model.childParamClass = parameter.getChildParamClass() or Parameter
+            self.model.setValues(None)
+        super(ArrayParameterWidget, self).setParameter(parameter, update)
+
     def _initArea(self):
+        lineEditClass = self._getEditWidgetClass()._lineEdit
+        self.model = ArrayModel(
+            childParamClass=self._parameter.getChildParamClass() or Parameter,
+            columns=self._getEditWidgetClass()._valueSize,
+            convertText=lineEditClass.convertText,
+            parent=self
+        )
+        self.tableView = ArrayTableView()
+        self.tableView.setMinimumHeight(100)
+        self.tableView.setModel(self.model)
+        self.tableView.setItemDelegate(ArrayItemDelegate(lineEditClass, parent=self.tableView))
+
         self.addButton = QtWidgets.QPushButton()
         self.addButton.setIcon(resource.get_qicon('btn', 'add_white.png'))
+        self.addButton.setToolTip('insert after the current element')
         self.addButton.setFixedSize(20, 20)
+        self.removeButton = QtWidgets.QPushButton()
+        self.removeButton.setIcon(resource.get_qicon('btn', 'close.png'))
+        self.removeButton.setToolTip('remove selected elements')
+        self.removeButton.setFixedSize(20, 20)
 
         self.areaWidget = QtWidgets.QWidget()
         self.areaLayout = QtWidgets.QVBoxLayout()
-        self.areaLayout.setAlignment(QtCore.Qt.AlignTop)
+        self.areaLayout.setContentsMargins(0, 0, 0, 0)
         self.buttonLayout = QtWidgets.QHBoxLayout()
         self.buttonLayout.addWidget(self.addButton)
+        self.buttonLayout.addWidget(self.removeButton)
         self.buttonLayout.setAlignment(QtCore.Qt.AlignRight)
 
-        self.formLayout = FormLayout()
-        self.formLayout.setLabelAlignment(QtCore.Qt.AlignCenter)
-        self.areaLayout.addLayout(self.formLayout)
+        self.areaLayout.addWidget(self.tableView)
         self.areaLayout.addLayout(self.buttonLayout)
         self.areaWidget.setLayout(self.areaLayout)
-        self.scrollArea.setWidget(self.areaWidget)
+        self.areaWidget.setVisible(0)
+        self.masterLayout.addWidget(self.areaWidget)
 
         self.addButton.clicked.connect(self._addClicked)
+        self.removeButton.clicked.connect(self._removeClicked)
+        self.model.valuesEdited.connect(self._editValueChanged)
 
     def _addClicked(self):
-        index = len(self.editWidgets)
-        self.addEditWidget(
-            index,
-            pyValue=self._parameter.getChildParamClass().getValueDefault()
-        )
+        index = self.tableView.currentIndex()
+        row = index.row() + 1 if index.isValid() else self.model.rowCount()
+        self.model.insertItems(row, [self.model.defaultItem()])
+        self.tableView.setCurrentIndex(self.model.index(row, 0))
+
+    def _removeClicked(self):
+        self.model.removeRowsList(self.tableView.selectedRows())
 
     def _expandClicked(self):
         self.expanded = 1 - self.expanded
         if self.areaWidget is None:
             self._initArea()
-        self.scrollArea.setVisible(self.expanded)
+        self.areaWidget.setVisible(self.expanded)
         self.expandButton.setFixedHeight(7 if self.expanded else 20)
         self.updateUI()
 
-    def addEditWidget(self, index, pyValue=None):
-        editWidgetClass = self._getEditWidgetClass()
-        editWidget = editWidgetClass()
-        editWidget.parameterWidget = self
-        indexLabel = ArrayIndexLabel(index)
-
-        editWidget.setPyValue(pyValue)
-
-        self.indexLabels.append(indexLabel)
-        self.editWidgets.append(editWidget)
-
-        editWidget.editValueChanged.connect(self._editValueChanged)
-        indexLabel.removeClicked.connect(self._editRemoveClicked)
-
-        self.formLayout.addRow(indexLabel, editWidget)
-
     def _updateUI(self):
         self.setToolTip(self._parameter.name())
-        text = 'expand...{}'.format(len(self._parameter.getValue()))
+        value = self._parameter.getValue()
+        text = 'expand...{}'.format(len(value) if value is not None else 0)
         self.expandButton.setText(text)
         self.expandButton.setToolTip(text)
 
-        if self.formLayout is not None and self.scrollArea.isVisible():
-            clearLayout(self.formLayout)
-            self.indexLabels = []
-            self.editWidgets = []
-
-            value = self._parameter.getValue()
-            value = self._parameter.convertValueToPy(value)
-
-            for index, v in enumerate(value):
-                self.addEditWidget(index, pyValue=v)
+        if self.model is not None and self.expanded:
+            self.model.setValues(value)
 
     def _editValueChanged(self):
-        value = [edit.getPyValue() for edit in self.editWidgets]
-        value = self._parameter.convertValueFromPy(value)
+        # elements are converted by the model, set the list itself
+        value = self.model.values()
+        text = 'expand...{}'.format(len(value))
+        self.expandButton.setText(text)
+        self.expandButton.setToolTip(text)
 
         self._breakSignal()
         self._parameter.setValue(value)
         self._reConnectSignal()
 
-    def _editRemoveClicked(self, index):
-        indexLabel = self.indexLabels[index]
-        editWidget = self.editWidgets[index]
-        self.indexLabels.remove(indexLabel)
-        self.editWidgets.remove(editWidget)
-
-        self.formLayout.removeRowWidget(editWidget)
-
-        for i in self.indexLabels:
-            if i.index > index:
-                i.setIndex(i.index - 1)
-
 
 class BasicWidget(object):
     def __init__(self):
@@ -338,22 +551,12 @@ class BasicLineEdit(QtWidgets.QLineEdit, BasicWidget):
         self.setStyleSheet('QLineEdit{background: rgb(40, 40, 40)}')
         self.setReadOnly(False)
 
+    @classmethod
+    def convertText(cls, text):
+        return text
+
     def getRealValue(self):
-        text = str(self.text())
-        validator = self.validator()
-        if validator is None:
-            value = text
-        elif isinstance(validator, QtGui.QIntValidator):
-            try:  # may be ''
-                value = int(text)
-            except:
-                value = 0
-        else:
-            try:  # may be ''
-                value = float(text)
-            except:
-                value = 0
-        return value
+        return self.convertText(str(self.text()))
 
     def mousePressEvent(self, event):
         super(BasicLineEdit, self).mousePressEvent(event)
@@ -400,6 +603,13 @@ class IntLineEdit(BasicLineEdit):
         validator = QtGui.QIntValidator()
         self.setValidator(validator)
 
+    @classmethod
+    def convertText(cls, text):
+        try:  # may be ''
+            return int(text)
+        except:
+            return 0
+
     def _enableEditMode(self):
         if self._editWidget is None:
             from pyNodeGraph.ui.nodeGraph import PY_NODE_GRAPH_WINDOW
@@ -417,6 +627,13 @@ class FloatLineEdit(BasicLineEdit):
         validator = QtGui.QDoubleValidator()
         self.setValidator(validator)
 
+    @classmethod
+    def convertText(cls, text):
+        try:  # may be ''
+            return float(text)
+        except:
+            return 0
+
     def _enableEditMode(self):
         if self._editWidget is None:
             from pyNodeGraph.ui.nodeGraph import PY_NODE_GRAPH_WINDOW
@@ -44,6 +44,11 @@ class ChooseWidget(QtWidgets.QWidget):
         self._map.update({value: label})
         return label
 
+    def clearOptions(self):
+        self._options = []
+        self._map = {}
+        self._comboBox.clear()
+
     def setPyValue(self, value):
         valueString = str(value)
         if valueString in self._map:
@@ -71,12 +76,13 @@ class ChooseParameterWidget(ChooseWidget, ParameterWidget):
     def setParameter(self, parameter):
         super(ChooseParameterWidget, self).setParameter(parameter)
         self._beforeUpdateUI()
+        self.clearOptions()
         options = self.getParameter().getHintValue('options', defaultValue=[])
         for option in options:
             label = self.addOption(option)
             if self._comboBox.findText(label) == -1:
                 self._comboBox.addItem(label)
-        completer = QtWidgets.QCompleter(options)
+        completer = QtWidgets.QCompleter(self._options)
         completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
         self._comboBox.setCompleter(completer)
         self._afterUpdateUI()
@@ -2,33 +2,6 @@ from pyNodeGraph.core.parameter.basic import Parameter
 from .param_widget import *
 
 
-Parameter.registerParameter(ObjectParameter)
-Parameter.registerParameter(StringParameter)
-Parameter.registerParameter(ChooseParameter)
-Parameter.registerParameter(FilePathParameter)
-Parameter.registerParameter(TextParameter)
-Parameter.registerParameter(BoolParameter)
-Parameter.registerParameter(NumberParameter)
-Parameter.registerParameter(IntParameter)
-Parameter.registerParameter(FloatParameter)
-Parameter.registerParameter(Vec2fParameter)
-Parameter.registerParameter(Vec3fParameter)
-Parameter.registerParameter(Vec4fParameter)
-Parameter.registerParameter(Color3fParameter)
-Parameter.registerParameter(Color4fParameter)
-
-Parameter.registerParameter(ObjectArrayParameter)
-Parameter.registerParameter(StringArrayParameter)
-Parameter.registerParameter(TokenArrayParameter)
-Parameter.registerParameter(NumberArrayParameter)
-Parameter.registerParameter(IntArrayParameter)
-Parameter.registerParameter(FloatArrayParameter)
-Parameter.registerParameter(Vec2fArrayParameter)
-Parameter.registerParameter(Vec3fArrayParameter)
-Parameter.registerParameter(Vec4fArrayParameter)
-Parameter.registerParameter(Color3fArrayParameter)
-
-
 Parameter.registerParameterWidget('object', StringParameterWidget)
 Parameter.registerParameterWidget('str', StringParameterWidget)
 Parameter.registerParameterWidget('choose', ChooseParameterWidget)
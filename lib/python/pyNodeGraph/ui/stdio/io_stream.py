@@ -3,43 +3,193 @@
 # 5/10/2019
 
 from pyNodeGraph.module.sqt import *
+from pyNodeGraph.utils.const import LOG_FILE
+import re
+import atexit
 import weakref
+import threading
+import collections
+import logging
+import logging.handlers
 
 
 RED_COLOR = QtGui.QColor(221, 30, 30)
 
+# lines kept in the log window, older lines are dropped
+LOG_MAX_LINES = 10000
+# writes waiting for the window are also dropped past these, for output without newlines (print(x, end=''))
+LOG_MAX_PENDING_WRITES = 10 * LOG_MAX_LINES
+LOG_MAX_PENDING_SIZE = 4 * 1024 * 1024
+# writes are written to the log file in chunks
+LOG_FILE_CHUNK = 1000
+LOG_FLUSH_INTERVAL = 50
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+
+LEVEL_PATTERN = re.compile(r'\[?(DEBUG|INFO|WARNING|ERROR)')
+LEVEL_COLORS = {
+    'DEBUG': QtGui.QColor(85, 170, 85),
+    'INFO': QtGui.QColor(119, 221, 119),
+    'WARNING': RED_COLOR,
+    'ERROR': RED_COLOR,
+}
+
+
+class OutputBuffer(QtCore.QObject):
+    """
+    collect the writes of stdout/stderr from any thread and append them to a QPlainTextEdit on a timer,
+    one insert per run of text with the same format.
+    the whole output is also written to a rotating file when LOG_FILE (PY_NODEGRAPH_LOG_FILE) is set.
+    """
+    _flushRequested = QtCore.Signal()
+
+    def __init__(self, outputWindow, logFile=LOG_FILE):
+        super(OutputBuffer, self).__init__()
 
-class ScriptStdout:
-    def __init__(self, outputWindow):
         self._outputWindowRef = weakref.ref(outputWindow)
-        self.stdoutTextFormat = QtGui.QTextCharFormat()
-        self.defaultTextColor = outputWindow.palette().color(outputWindow.foregroundRole())
-        self.stdoutTextFormat.setForeground(self.defaultTextColor)
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        self._pendingLines = 0
+        self._pendingSize = 0
+        # writes not in the log file yet, kept apart from the pending ones which may be dropped
+        self._fileTexts = []
+        self._flushScheduled = False
+        self._pop = False
+
+        self._fileHandler = None
+        if logFile:
+            self._fileHandler = logging.handlers.RotatingFileHandler(
+                logFile, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT
+            )
+            self._fileHandler.terminator = ''
+            self._fileHandler.setFormatter(logging.Formatter('%(message)s'))
+            # the last writes are only on their way to the file, don't lose them when quitting
+            app = QtWidgets.QApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(self.flushFile)
+            atexit.register(self.flushFile)
+
+        # queued, the timer is started in the gui thread whichever thread writes
+        self._flushRequested.connect(self._scheduleFlush, QtCore.Qt.QueuedConnection)
+
+    def write(self, text, textFormat, pop=False):
+        if not text:
+            return
+        with self._lock:
+            self._pending.append((text, textFormat))
+            self._pendingLines += text.count('\n')
+            self._pendingSize += len(text)
+            if pop:
+                self._pop = True
+            # the window would drop these lines anyway
+            while len(self._pending) > 1 and (
+                self._pendingLines > LOG_MAX_LINES or
+                len(self._pending) > LOG_MAX_PENDING_WRITES or
+                self._pendingSize > LOG_MAX_PENDING_SIZE
+            ):
+                dropped = self._pending.popleft()[0]
+                self._pendingLines -= dropped.count('\n')
+                self._pendingSize -= len(dropped)
+            if self._fileHandler is not None:
+                self._fileTexts.append(text)
+                if len(self._fileTexts) > LOG_FILE_CHUNK:
+                    self._writeFile()
+            schedule = not self._flushScheduled
+            self._flushScheduled = True
+        if schedule:
+            self._flushRequested.emit()
+
+    def _scheduleFlush(self):
+        QtCore.QTimer.singleShot(LOG_FLUSH_INTERVAL, self.flush)
+
+    def _writeFile(self):
+        # called with the lock held, the file gets the writes in order
+        if len(self._fileTexts) > 0:
+            texts = self._fileTexts
+            self._fileTexts = []
+            self._fileHandler.handle(logging.makeLogRecord({'msg': ''.join(texts)}))
+
+    def flushFile(self):
+        """
+        write what is not in the log file yet, without the window, also called when quitting
+        """
+        if self._fileHandler is None:
+            return
+        with self._lock:
+            self._writeFile()
+            self._fileHandler.flush()
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = collections.deque()
+            self._pendingLines = 0
+            self._pendingSize = 0
+            self._flushScheduled = False
+            pop = self._pop
+            self._pop = False
+            if self._fileHandler is not None:
+                self._writeFile()
+        if len(pending) == 0:
+            return
 
-    def write(self, text):
         outputWindow = self._outputWindowRef()
         if not outputWindow:
             return
-        if text.startswith('DEBUG'):
-            self.stdoutTextFormat.setForeground(QtGui.QColor(85, 170, 85))
-        elif text.startswith('INFO'):
-            self.stdoutTextFormat.setForeground(QtGui.QColor(119, 221, 119))
-        elif text.startswith('WARNING'):
-            self.stdoutTextFormat.setForeground(RED_COLOR)
-        elif text.startswith('ERROR'):
-            self.stdoutTextFormat.setForeground(RED_COLOR)
+
+        cursor = QtGui.QTextCursor(outputWindow.document())
+        cursor.movePosition(QtGui.QTextCursor.End)
+        cursor.beginEditBlock()
+        texts = []
+        currentFormat = None
+        for text, textFormat in pending:
+            if textFormat is not currentFormat and len(texts) > 0:
+                cursor.insertText(''.join(texts), currentFormat)
+                texts = []
+            currentFormat = textFormat
+            texts.append(text)
+        cursor.insertText(''.join(texts), currentFormat)
+        cursor.endEditBlock()
+
+        scrollBar = outputWindow.verticalScrollBar()
+        scrollBar.setValue(scrollBar.maximum())
+
+        if pop:
+            logWindow = outputWindow.parent()
+            if not logWindow.isActiveWindow():
+                logWindow.showMinimized()
+                logWindow.showNormal()
+                logWindow.activateWindow()
+
+
+class ScriptStdout:
+    def __init__(self, outputBuffer):
+        self._outputBuffer = outputBuffer
+        outputWindow = outputBuffer._outputWindowRef()
+        self.defaultTextColor = outputWindow.palette().color(outputWindow.foregroundRole())
+        self.stdoutTextFormat = QtGui.QTextCharFormat()
+        self.stdoutTextFormat.setForeground(self.defaultTextColor)
+        self.levelTextFormats = {}
+        for level, color in LEVEL_COLORS.items():
+            textFormat = QtGui.QTextCharFormat()
+            textFormat.setForeground(color)
+            self.levelTextFormats[level] = textFormat
+
+    def write(self, text):
+        match = LEVEL_PATTERN.match(text)
+        if match is not None:
+            textFormat = self.levelTextFormats[match.group(1)]
         else:
-            self.stdoutTextFormat.setForeground(self.defaultTextColor)
-        outputWindow.moveCursor(QtGui.QTextCursor.End)
-        outputWindow.textCursor().insertText(text, self.stdoutTextFormat)
+            textFormat = self.stdoutTextFormat
+        self._outputBuffer.write(text, textFormat)
 
     def flush(self):
         pass
 
 
 class ScriptStderr:
-    def __init__(self, outputWindow, realstderr):
-        self._outputWindowRef = weakref.ref(outputWindow)
+    def __init__(self, outputBuffer, realstderr):
+        self._outputBuffer = outputBuffer
         self.errorTextFormat = QtGui.QTextCharFormat()
         self.errorTextFormat.setFontWeight(QtGui.QFont.Normal)
         self.errorTextFormat.setForeground(RED_COLOR)
@@ -47,19 +197,7 @@ class ScriptStderr:
         self.pop = False
 
     def write(self, text):
-        outputWindow = self._outputWindowRef()
-        if not outputWindow:
-            return
-        outputWindow.moveCursor(QtGui.QTextCursor.End)
-        outputWindow.textCursor().insertText(text, self.errorTextFormat)
-        outputWindow.textCursor().movePosition(QtGui.QTextCursor.End)
-
-        if self.pop:
-            logWindow = outputWindow.parent()
-            if not logWindow.isActiveWindow():
-                logWindow.showMinimized()
-                logWindow.showNormal()
-                logWindow.activateWindow()
+        self._outputBuffer.write(text, self.errorTextFormat, pop=self.pop)
 
     def flush(self):
         pass
@@ -7,7 +7,7 @@ import sys
 import logging
 from pyNodeGraph.module.sqt import *
 from pyNodeGraph.utils.log import set_logger
-from .io_stream import ScriptStderr, ScriptStdout, ScriptStdin
+from .io_stream import ScriptStderr, ScriptStdout, ScriptStdin, OutputBuffer, LOG_MAX_LINES
 
 
 class LogWindow(QtWidgets.QWidget):
@@ -23,20 +23,22 @@ class LogWindow(QtWidgets.QWidget):
         self.masterLayout = QtWidgets.QVBoxLayout()
         self.setLayout(self.masterLayout)
 
-        self._outputWindow = QtWidgets.QTextEdit(parent=self)
+        self._outputWindow = QtWidgets.QPlainTextEdit(parent=self)
         self._outputWindow.setStyleSheet("""
                         background: palette(window)
                         """)
         self._outputWindow.setReadOnly(True)
-        self._outputWindow.setLineWrapMode(QtWidgets.QTextEdit.NoWrap)
+        self._outputWindow.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self._outputWindow.setMaximumBlockCount(LOG_MAX_LINES)
 
         self.masterLayout.addWidget(self._outputWindow)
 
         self.setGeometry(200, 200, 500, 300)
 
     def redirect_output(self):
-        self.stdout = ScriptStdout(self._outputWindow)
-        self.stderr = ScriptStderr(self._outputWindow, sys.stdout)
+        self.outputBuffer = OutputBuffer(self._outputWindow)
+        self.stdout = ScriptStdout(self.outputBuffer)
+        self.stderr = ScriptStderr(self.outputBuffer, sys.stdout)
         # self.stderr.pop = True
         self.stdin = ScriptStdin(self)
 
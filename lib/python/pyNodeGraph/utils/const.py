@@ -17,4 +17,5 @@ OUTPUT_ATTRIBUTE_PREFIX = 'outputs:'
 
 
 VIEWPORT_FULL_UPDATE = os.environ.get('PY_NODEGRAPH_VIEWPORT_FULL_UPDATE', '0')
-
+# write the output of the log window to this file too, rotated by size
+LOG_FILE = os.environ.get('PY_NODEGRAPH_LOG_FILE', '')
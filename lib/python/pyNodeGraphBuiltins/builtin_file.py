@@ -6,12 +6,14 @@ class FileFlowNode(PyFlowNode):
     fillNormalColor = (95, 95, 145)
     borderNormalColor = (170, 250, 160)
     nodeGroup = 'File'
+    deferGotoNext = True
 
 
 class FileNonFlowNode(PyNonFlowNode):
     fillNormalColor = (95, 95, 145)
     borderNormalColor = (170, 250, 160)
     nodeGroup = 'File'
+    cacheable = False
 
 
 class OpenFileNode(FileFlowNode):
@@ -36,8 +38,8 @@ class OpenFileNode(FileFlowNode):
         file = self.getFlowValue('inputs:file')
         mode = self.getFlowValue('inputs:mode')
         f = open(file, mode)
-        self.parameter('outputs:result').setValue(f)
-        self.gotoNext()
+        self.setFlowValue('outputs:result', f)
+        yield 'Out'
         f.close()
 
 
@@ -76,6 +78,7 @@ class FileWriteLinesNode(FileFlowNode):
 
 
 class FileIOParameter(_NonBuiltinParameter):
+    __slots__ = ()
     parameterTypeString = 'fileIO'
 
 
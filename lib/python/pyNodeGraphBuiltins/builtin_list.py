@@ -3,6 +3,7 @@ from pyNodeGraph.core.node.pyNode import PyNonFlowNode, PyFlowNode, Node
 
 class _ListNode(PyFlowNode):
     nodeGroup = 'List'
+    deferGotoNext = True
 
 
 class ListAppendNode(_ListNode):
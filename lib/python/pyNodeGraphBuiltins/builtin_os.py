@@ -14,6 +14,7 @@ class OsFlowNode(PyFlowNode):
     fillNormalColor = (80, 150, 70)
     borderNormalColor = (160, 180, 200)
     nodeGroup = 'os'
+    deferGotoNext = True
 
 
 class GetJoinPathNode(OsNode):
@@ -46,6 +47,7 @@ class GetPathBasenameNode(SingleArgResultNode):
 
 class DoesPathExistsNode(OsNode):
     nodeType = 'Does Path Exists'
+    cacheable = False
     args = [{'type': 'str'}]
     results = [{'type': 'bool'}]
 
@@ -55,6 +57,7 @@ class DoesPathExistsNode(OsNode):
 
 class GetDirContentNode(OsNode):
     nodeType = 'Get Dir Content'
+    cacheable = False
     args = [{'type': 'str', 'name': 'dir'}]
     results = [{'type': 'str[]'}]
 
@@ -132,14 +135,14 @@ class OsWalkNode(OsFlowNode):
     def _execute(self):
         path = self.getFlowValue('inputs:path')
         for root, dirs, files in os.walk(path):
-            self.parameter('outputs:root').setValue(root)
-            self.gotoNext('For Each Root')
+            self.setFlowValue('outputs:root', root)
+            yield 'For Each Root'
             for d in dirs:
-                self.parameter('outputs:dir').setValue(d)
-                self.gotoNext('For Each Dir')
+                self.setFlowValue('outputs:dir', d)
+                yield 'For Each Dir'
             for f in files:
-                self.parameter('outputs:file').setValue(f)
-                self.gotoNext('For Each File')
+                self.setFlowValue('outputs:file', f)
+                yield 'For Each File'
         self.gotoNext('Finally')
 
 
@@ -6,6 +6,7 @@ class ShutilFlowNode(PyFlowNode):
     fillNormalColor = (65, 145, 75)
     borderNormalColor = (180, 220, 250)
     nodeGroup = 'shutil'
+    deferGotoNext = True
 
 
 class CopyFileNode(ShutilFlowNode):
@@ -10,6 +10,7 @@ class _TimeNode(PyNonFlowNode):
 
 class GetTimeNode(_TimeNode):
     nodeType = 'Get Time'
+    cacheable = False
     results = [{'type': 'float'}]
 
     def _executeArgs(self, *args):
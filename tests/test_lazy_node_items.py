@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'python'))
+
+from pyNodeGraph.module.sqt import QtWidgets, QtCore
+from pyNodeGraph.core.graph.graph import Graph
+from pyNodeGraph.ui.graph.view import GraphicsScene
+from pyNodeGraph.ui.graph.nodeItem import NodeItem
+from pyNodeGraph.ui.graph.other.pipe import Pipe
+
+# Main -> Print -> Print1, far enough apart to be in different cells of the scene grid
+GRAPH = """<?xml version="1.0" encoding="utf-8"?>
+<pynodegraph>
+	<n c="Main" n="Main">
+		<p n="x" val="0.0"/>
+		<p n="y" val="0.0"/>
+		<o conN="Print" conP="In" n="Out"/>
+	</n>
+	<n c="Print" n="Print">
+		<p n="x" val="20000.0"/>
+		<p n="y" val="0.0"/>
+		<o conN="Print1" conP="In" n="Out"/>
+		<i conN="Main" conP="Out" n="In"/>
+	</n>
+	<n c="Print" n="Print1">
+		<p n="x" val="20000.0"/>
+		<p n="y" val="40000.0"/>
+		<i conN="Print" conP="Out" n="In"/>
+	</n>
+</pynodegraph>
+"""
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class LazyNodeItemsTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        path = os.path.join(self.tempDir, 'graph.pyng')
+        with open(path, 'w') as f:
+            f.write(GRAPH)
+
+        # the scene takes over the nodes of a headless graph, like it does when it opens a file
+        graph = Graph()
+        graph.createNodesFromFile(path)
+        self.scene = GraphicsScene()
+        self.scene._addNodeModels(graph.allNodes())
+        self.xml = self.scene.getAllNodesAsXml()
+
+        # items for the nodes around Main, Print is at the other end of a connection of Main
+        self.scene.createNodeItemsInRect(QtCore.QRectF(-500, -500, 1000, 1000))
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def _getItemPorts(self):
+        return [port for node in self.scene.allNodes() if isinstance(node, NodeItem) for port in node.ports]
+
+    def test_connection_to_node_without_item(self):
+        printItem = self.scene.getNode('Print')
+        self.assertIsInstance(printItem, NodeItem)
+        self.assertNotIsInstance(self.scene.getNode('Print1'), NodeItem)
+
+        for port in self._getItemPorts():
+            for pipe in port.pipes:
+                self.assertIsInstance(pipe, Pipe)
+
+        outPort = printItem.getOutputPort('Out')
+        self.assertEqual(outPort.pipes, [])
+        self.assertEqual([port.node().name() for port in outPort.getConnections()], ['Print1'])
+
+        printItem.setSelected(True)
+        self.scene.updateSelectedNodesPipe()
+        printItem.updatePipe()
+
+        self.assertEqual(self.scene.getAllNodesAsXml(), self.xml)
+
+    def test_pipe_when_both_ends_have_items(self):
+        print1Item = self.scene.createNodeItem(self.scene.getNode('Print1'))
+
+        outPort = self.scene.getNode('Print').getOutputPort('Out')
+        self.assertEqual(len(outPort.pipes), 1)
+        self.assertEqual(outPort.connections, outPort.pipes)
+        self.assertIs(outPort.pipes[0].target, print1Item.getInputPort('In'))
+        self.assertEqual(self.scene.getAllNodesAsXml(), self.xml)
+
+    def test_delete_node_with_connection_to_node_without_item(self):
+        self.scene.deleteNode(self.scene.getNode('Print'))
+
+        print1 = self.scene.getNode('Print1')
+        self.assertEqual(print1.getInputPort('In').getConnections(), [])
+        self.assertEqual(len(self.scene.getEdgeModels(QtCore.QRectF(-50000, -50000, 100000, 100000))), 0)
+        for port in self._getItemPorts():
+            self.assertEqual(port.connections, [])
+
+
+if __name__ == '__main__':
+    unittest.main()